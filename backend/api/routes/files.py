@@ -44,7 +44,7 @@ def get_file_size(file_path: Path) -> int:
 
 def is_previewable(file_type: str) -> bool:
     """判断文件类型是否可以预览"""
-    return file_type in ['txt', 'json', 'srt', 'xlsx']
+    return file_type in ['txt', 'json', 'jsonl', 'srt', 'xlsx', 'parquet']
 
 
 @router.get('/stage/{stage_name}')
@@ -95,11 +95,12 @@ async def preview_file(
     file_size = get_file_size(file_path)
     
     # 根据文件类型处理预览
-    if file_type == 'json':
+    if file_type in ['json', 'jsonl']:
         try:
             import json
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                # jsonl: LLM logs, one entry per line
+                data = json.load(f) if file_type == 'json' else [json.loads(line) for line in f if line.strip()]
             content = json.dumps(data, indent=2, ensure_ascii=False)
             # 限制行数
             lines = content.split('\n')
@@ -151,10 +152,10 @@ async def preview_file(
                 error=str(e)
             ).model_dump(by_alias=True)
     
-    elif file_type == 'xlsx':
+    elif file_type in ['xlsx', 'parquet']:
         try:
             import pandas as pd
-            df = pd.read_excel(file_path)
+            df = pd.read_excel(file_path) if file_type == 'xlsx' else pd.read_parquet(file_path)
             # 转换为 markdown 表格格式便于预览
             if len(df) > 100:
                 content = df.head(100).to_markdown(index=False)
@@ -164,7 +165,7 @@ async def preview_file(
             return FilePreviewResponse(
                 name=file_path.name,
                 path=path,
-                type='xlsx',
+                type=file_type,
                 content=content,
                 size=file_size,
                 preview_available=True
@@ -173,7 +174,7 @@ async def preview_file(
             return FilePreviewResponse(
                 name=file_path.name,
                 path=path,
-                type='xlsx',
+                type=file_type,
                 content=None,
                 size=file_size,
                 preview_available=False,
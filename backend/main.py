@@ -2,6 +2,7 @@
 VedioAITranslateSub Backend - FastAPI Application
 """
 
+import asyncio
 import os
 import sys
 import time
@@ -100,6 +101,26 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             raise
 
 
+def preload_nlp_model():
+    """Load the spaCy model for the configured language into the process-wide cache"""
+    try:
+        from core.utils import load_key
+        from core.spacy_utils.load_nlp_model import preload_nlp
+
+        try:
+            enabled = load_key("model_cache.preload_nlp")
+        except KeyError:
+            enabled = True
+        if enabled is False:
+            return
+        start_time = time.time()
+        if preload_nlp() is not None:
+            logger.info(f"spaCy model preloaded ({time.time() - start_time:.1f}s)")
+    except Exception as e:
+        # jobs will load the model on demand instead
+        logger.warning(f"spaCy model preload failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler"""
@@ -107,7 +128,11 @@ async def lifespan(app: FastAPI):
     logger.info("Starting VedioAITranslateSub Backend...")
     logger.info(f"Project root: {PROJECT_ROOT}")
     logger.info("=" * 50)
+    # warm up in the background so startup is not blocked by the model load
+    preload_task = asyncio.create_task(asyncio.to_thread(preload_nlp_model))
     yield
+    if not preload_task.done():
+        preload_task.cancel()
     logger.info("Shutting down VedioAITranslateSub Backend...")
 
 
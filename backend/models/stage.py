@@ -2,10 +2,16 @@
 Processing stage data model
 """
 
+import os
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Literal, List
 from datetime import datetime
 
+from core.utils.models import (
+    TABLE_FORMAT, _2_CLEANED_CHUNKS, _2_SEGMENTS, _4_2_TRANSLATION,
+    _5_SPLIT_SUB, _5_REMERGED, _6_SUBTITLES, _6_AUDIO_SUBTITLES, _8_1_AUDIO_TASK,
+)
+
 
 StageStatus = Literal["pending", "running", "completed", "failed", "skipped"]
 
@@ -23,7 +29,7 @@ class StageOutputFile(BaseModel):
 
     name: str = Field(..., description="文件名")
     path: str = Field(..., description="相对路径")
-    type: str = Field(..., description="文件类型: xlsx, txt, json, srt, mp4, mp3")
+    type: str = Field(..., description="文件类型: parquet, xlsx, txt, json, srt, mp4, mp3")
     description: str = Field(..., description="文件描述")
     exists: bool = Field(default=False, description="文件是否存在")
     size: Optional[int] = Field(None, description="文件大小(bytes)")
@@ -54,15 +60,15 @@ STAGE_OUTPUT_FILES = {
     # 字幕处理阶段
     "asr": [
         {
-            "name": "cleaned_chunks.xlsx",
-            "path": "output/log/cleaned_chunks.xlsx",
-            "type": "xlsx",
+            "name": os.path.basename(_2_CLEANED_CHUNKS),
+            "path": _2_CLEANED_CHUNKS,
+            "type": TABLE_FORMAT,
             "description": "ASR逐字识别结果（Word级时间戳）",
         },
         {
-            "name": "segments.xlsx",
-            "path": "output/log/segments.xlsx",
-            "type": "xlsx",
+            "name": os.path.basename(_2_SEGMENTS),
+            "path": _2_SEGMENTS,
+            "type": TABLE_FORMAT,
             "description": "ASR逐句识别结果（Segment级时间戳）",
         },
         {
@@ -118,8 +124,8 @@ STAGE_OUTPUT_FILES = {
             "description": "GPT语义分句结果",
         },
         {
-            "name": "split_by_meaning.json",
-            "path": "output/gpt_log/split_by_meaning.json",
+            "name": "split_by_meaning.jsonl",
+            "path": "output/gpt_log/split_by_meaning.jsonl",
             "type": "json",
             "description": "GPT分句日志",
         },
@@ -132,8 +138,8 @@ STAGE_OUTPUT_FILES = {
             "description": "术语表和主题摘要",
         },
         {
-            "name": "summary.json",
-            "path": "output/gpt_log/summary.json",
+            "name": "summary.jsonl",
+            "path": "output/gpt_log/summary.jsonl",
             "type": "json",
             "description": "LLM摘要日志",
         },
@@ -146,40 +152,40 @@ STAGE_OUTPUT_FILES = {
             "description": "原始翻译对照（未处理）",
         },
         {
-            "name": "translation_results.xlsx",
-            "path": "output/log/translation_results.xlsx",
-            "type": "xlsx",
+            "name": os.path.basename(_4_2_TRANSLATION),
+            "path": _4_2_TRANSLATION,
+            "type": TABLE_FORMAT,
             "description": "翻译结果（带时间戳）",
         },
         {
-            "name": "translate_faithfulness.json",
-            "path": "output/gpt_log/translate_faithfulness.json",
+            "name": "translate_faithfulness.jsonl",
+            "path": "output/gpt_log/translate_faithfulness.jsonl",
             "type": "json",
             "description": "LLM直译日志",
         },
         {
-            "name": "translate_expressiveness.json",
-            "path": "output/gpt_log/translate_expressiveness.json",
+            "name": "translate_expressiveness.jsonl",
+            "path": "output/gpt_log/translate_expressiveness.jsonl",
             "type": "json",
             "description": "LLM意译日志",
         },
     ],
     "split_sub": [
         {
-            "name": "translation_results_for_subtitles.xlsx",
-            "path": "output/log/translation_results_for_subtitles.xlsx",
-            "type": "xlsx",
+            "name": os.path.basename(_5_SPLIT_SUB),
+            "path": _5_SPLIT_SUB,
+            "type": TABLE_FORMAT,
             "description": "字幕分割结果",
         },
         {
-            "name": "translation_results_remerged.xlsx",
-            "path": "output/log/translation_results_remerged.xlsx",
-            "type": "xlsx",
+            "name": os.path.basename(_5_REMERGED),
+            "path": _5_REMERGED,
+            "type": TABLE_FORMAT,
             "description": "重新合并的翻译",
         },
         {
-            "name": "align_subs.json",
-            "path": "output/gpt_log/align_subs.json",
+            "name": "align_subs.jsonl",
+            "path": "output/gpt_log/align_subs.jsonl",
             "type": "json",
             "description": "LLM字幕对齐日志",
         },
@@ -209,6 +215,12 @@ STAGE_OUTPUT_FILES = {
             "type": "srt",
             "description": "双语字幕（翻译在上）",
         },
+        {
+            "name": os.path.basename(_6_SUBTITLES),
+            "path": _6_SUBTITLES,
+            "type": TABLE_FORMAT,
+            "description": "字幕表（毫秒时间轴）",
+        },
     ],
     "proofread": [],  # Manual proofreading stage - no automatic output files
     "merge_sub": [
@@ -222,9 +234,9 @@ STAGE_OUTPUT_FILES = {
     # 配音处理阶段
     "audio_task": [
         {
-            "name": "tts_tasks.xlsx",
-            "path": "output/audio/tts_tasks.xlsx",
-            "type": "xlsx",
+            "name": os.path.basename(_8_1_AUDIO_TASK),
+            "path": _8_1_AUDIO_TASK,
+            "type": TABLE_FORMAT,
             "description": "TTS任务列表",
         },
         {
@@ -239,6 +251,12 @@ STAGE_OUTPUT_FILES = {
             "type": "srt",
             "description": "源语言配音字幕",
         },
+        {
+            "name": os.path.basename(_6_AUDIO_SUBTITLES),
+            "path": _6_AUDIO_SUBTITLES,
+            "type": TABLE_FORMAT,
+            "description": "配音用字幕表",
+        },
     ],
     "dub_chunks": [
         {
@@ -24,6 +24,7 @@ _project_root = get_project_root()
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 from core.utils.config_utils import set_cancel_flag, clear_cancel_flag
+from core.utils.models import _6_SUBTITLES
 
 logger = logging.getLogger(__name__)
 
@@ -736,6 +737,7 @@ class ProcessingService:
         - output/log/ directory
         - output/gpt_log/ directory
         - *.srt files in output/
+        - the subtitle table (output/subtitles.<format>)
 
         Preserves:
         - audio/raw.mp3
@@ -764,6 +766,12 @@ class ProcessingService:
             srt_file.unlink()
             cleaned_paths.append(str(srt_file))
 
+        # Clean the subtitle table the SRT files are rendered from
+        subtitle_table = self.output_dir / Path(_6_SUBTITLES).name
+        if subtitle_table.exists():
+            subtitle_table.unlink()
+            cleaned_paths.append(str(subtitle_table))
+
         # Clean intermediate JSON files
         intermediate_files = [
             "transcript.json",
@@ -862,7 +870,8 @@ class ProcessingService:
         - output/log/ directory
         - output/gpt_log/ directory
         - output/audio/ directory (including raw.mp3, vocal.mp3, background.mp3)
-        - All *.srt, output*.mp4 (output videos only), *.xlsx, *.json, *.mp3 files
+        - All *.srt, output*.mp4 (output videos only), *.xlsx, *.parquet, *.json, *.mp3 files
+        - the subtitle table (output/subtitles.<format>)
 
         IMPORTANT: Original video files are preserved!
         """
@@ -915,6 +924,17 @@ class ProcessingService:
             xlsx_file.unlink()
             cleaned_paths.append(str(xlsx_file))
 
+        # Clean Parquet tables
+        for parquet_file in output_dir.glob("*.parquet"):
+            parquet_file.unlink()
+            cleaned_paths.append(str(parquet_file))
+
+        # Clean the subtitle table, whatever format it was written in
+        subtitle_table = output_dir / Path(_6_SUBTITLES).name
+        if subtitle_table.exists():
+            subtitle_table.unlink()
+            cleaned_paths.append(str(subtitle_table))
+
         # Clean JSON files
         for json_file in output_dir.glob("*.json"):
             json_file.unlink()
@@ -12,6 +12,12 @@ from dataclasses import dataclass
 from datetime import timedelta
 
 from api.deps import get_output_dir, get_project_root
+from core.utils.models import _6_SUBTITLES
+from core.utils.subtitle_table import (
+    build_subtitle_table,
+    read_subtitle_table,
+    write_subtitle_table,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -285,10 +291,41 @@ class SubtitleService:
         self.write_srt_file(src_trans_entries, src_trans_srt, include_original=True)
         saved_files.append(str(src_trans_srt))
 
+        # Keep _6_SUBTITLES in sync with the edits, dub_chunks reads its lines from it
+        # (audio_task reads _6_AUDIO_SUBTITLES, which proofreading does not touch)
+        saved_files.append(str(self.save_subtitle_table(entries)))
+
         logger.info(f"Saved subtitles to {len(saved_files)} files")
 
         return {"success": True, "savedFiles": saved_files, "entryCount": len(entries)}
 
+    def save_subtitle_table(self, entries: List[SubtitleEntry]) -> Path:
+        """
+        Write edited entries to the subtitle table
+
+        Speakers are not editable, they are kept from the existing table
+        when the number of entries is unchanged.
+        """
+        table_path = self.output_dir / Path(_6_SUBTITLES).name
+        speakers = None
+        if table_path.exists():
+            try:
+                previous = read_subtitle_table(str(table_path))
+                if len(previous) == len(entries):
+                    speakers = previous["speaker"].tolist()
+            except Exception as e:
+                logger.warning(f"Could not read existing subtitle table: {e}")
+
+        table = build_subtitle_table(
+            [entry.original_text or entry.text for entry in entries],
+            [entry.text for entry in entries],
+            [entry.start_time for entry in entries],
+            [entry.end_time for entry in entries],
+            speakers,
+        )
+        write_subtitle_table(table, str(table_path))
+        return table_path
+
     # ========== Merge to Video ==========
 
     def merge_subtitles_to_video(self, subtitle_type: str = "dual") -> dict:
@@ -534,7 +571,7 @@ class SubtitleService:
         backup_dir = self.get_backup_dir()
 
         # List of files to backup
-        srt_files = ["src.srt", "trans.srt", "trans_src.srt", "src_trans.srt"]
+        srt_files = ["src.srt", "trans.srt", "trans_src.srt", "src_trans.srt", Path(_6_SUBTITLES).name]
         backed_up = []
         skipped = []
 
@@ -591,7 +628,7 @@ class SubtitleService:
             }
 
         # List of files to restore
-        srt_files = ["src.srt", "trans.srt", "trans_src.srt", "src_trans.srt"]
+        srt_files = ["src.srt", "trans.srt", "trans_src.srt", "src_trans.srt", Path(_6_SUBTITLES).name]
         restored = []
 
         for filename in srt_files:
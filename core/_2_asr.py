@@ -1,8 +1,77 @@
+import os
+import multiprocessing
+import concurrent.futures
 from core.utils import *
 from core.asr_backend.demucs_vl import demucs_audio
 from core.asr_backend.audio_preprocess import process_transcription, convert_video_to_audio, split_audio, save_results, save_segments, normalize_audio_volume
 from core._1_ytdlp import find_video_files
 from core.utils.models import *
+from core.utils.config_utils import defer_config_writes, pop_deferred_updates
+
+# Runtimes that run the model locally and can be spread across CPU worker processes
+LOCAL_RUNTIMES = ("whisper", "local", "whisperx_local")
+
+def get_transcriber(runtime):
+    """Return the transcribe function for the configured runtime"""
+    # Runtime options:
+    # - whisper: Native Faster-Whisper (recommended, like PotPlayer, best accuracy)
+    # - whisperx_local / local: WhisperX with pyannote VAD (legacy)
+    # - cloud: WhisperX Cloud via 302.ai API
+    # - elevenlabs: ElevenLabs ASR API
+    if runtime == "whisper":
+        from core.asr_backend.whisper_native import transcribe_audio_native as ts
+    elif runtime in ("local", "whisperx_local"):
+        from core.asr_backend.whisperX_local import transcribe_audio as ts
+    elif runtime == "cloud":
+        from core.asr_backend.whisperX_302 import transcribe_audio_302 as ts
+    elif runtime == "elevenlabs":
+        from core.asr_backend.elevenlabs_asr import transcribe_audio_elevenlabs as ts
+    else:
+        # Default to native whisper
+        from core.asr_backend.whisper_native import transcribe_audio_native as ts
+    return ts
+
+# ------------
+# CPU worker pool
+# ------------
+
+def get_cpu_workers(segment_count):
+    """Number of worker processes and CPU threads per worker"""
+    try:
+        workers = int(load_key("whisper.cpu_workers") or 1)
+    except KeyError:
+        workers = 1
+    workers = max(1, min(workers, segment_count))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    return workers, threads
+
+def _init_asr_worker(cpu_threads):
+    from core.asr_backend.model_registry import set_cpu_threads
+    # only the parent process writes config.yaml
+    defer_config_writes()
+    set_cpu_threads(cpu_threads)
+
+def _transcribe_segment(runtime, raw_audio, vocal_audio, start, end, language, device):
+    ts = get_transcriber(runtime)
+    result = ts(raw_audio, vocal_audio, start, end, language, device)
+    return result, pop_deferred_updates()
+
+def transcribe_segments_parallel(runtime, vocal_audio, segments, language, device, workers, cpu_threads):
+    """Transcribe segments in separate processes, results keep segment order"""
+    rprint(f"[cyan]🧵 Transcribing {len(segments)} segments with {workers} processes x {cpu_threads} threads...[/cyan]")
+    ctx = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_asr_worker, initargs=(cpu_threads,)) as executor:
+        futures = [
+            executor.submit(_transcribe_segment, runtime, _RAW_AUDIO_FILE, vocal_audio, start, end, language, device)
+            for start, end in segments
+        ]
+        all_results = []
+        for future in futures:
+            result, updates = future.result()
+            for key, value in updates.items():
+                update_key(key, value)
+            all_results.append(result)
+    return all_results
 
 @check_file_exists(_2_CLEANED_CHUNKS)
 def transcribe():
@@ -19,54 +88,48 @@ def transcribe():
 
     # 3. Extract audio
     segments = split_audio(_RAW_AUDIO_FILE)
-    
+
     # 4. Transcribe audio by clips
     all_results = []
     runtime = load_key("whisper.runtime")
-    
+
     # Load common transcription parameters
     import torch
     WHISPER_LANGUAGE = load_key("whisper.language")
     device = "cuda" if torch.cuda.is_available() else "cpu"
-    
-    # Runtime options:
-    # - whisper: Native Faster-Whisper (recommended, like PotPlayer, best accuracy)
-    # - whisperx_local / local: WhisperX with pyannote VAD (legacy)
-    # - cloud: WhisperX Cloud via 302.ai API
-    # - elevenlabs: ElevenLabs ASR API
-    
+
     if runtime == "whisper":
-        from core.asr_backend.whisper_native import transcribe_audio_native as ts
         rprint("[cyan]🎤 Transcribing with Native Faster-Whisper (like PotPlayer)...[/cyan]")
     elif runtime in ("local", "whisperx_local"):
-        from core.asr_backend.whisperX_local import transcribe_audio as ts
         rprint("[cyan]🎤 Transcribing with WhisperX Local (VAD + Alignment)...[/cyan]")
     elif runtime == "cloud":
-        from core.asr_backend.whisperX_302 import transcribe_audio_302 as ts
         rprint("[cyan]🎤 Transcribing audio with 302 API...[/cyan]")
     elif runtime == "elevenlabs":
-        from core.asr_backend.elevenlabs_asr import transcribe_audio_elevenlabs as ts
         rprint("[cyan]🎤 Transcribing audio with ElevenLabs API...[/cyan]")
     else:
-        # Default to native whisper
-        from core.asr_backend.whisper_native import transcribe_audio_native as ts
         rprint(f"[yellow]⚠️ Unknown runtime '{runtime}', using Native Faster-Whisper...[/yellow]")
 
-    for start, end in segments:
-        result = ts(_RAW_AUDIO_FILE, vocal_audio, start, end, WHISPER_LANGUAGE, device)
-        all_results.append(result)
-    
+    # Many-core CPU boxes: transcribe segments concurrently in worker processes
+    workers, cpu_threads = get_cpu_workers(len(segments))
+    if device == "cpu" and runtime in LOCAL_RUNTIMES and workers > 1:
+        all_results = transcribe_segments_parallel(runtime, vocal_audio, segments, WHISPER_LANGUAGE, device, workers, cpu_threads)
+    else:
+        ts = get_transcriber(runtime)
+        for start, end in segments:
+            result = ts(_RAW_AUDIO_FILE, vocal_audio, start, end, WHISPER_LANGUAGE, device)
+            all_results.append(result)
+
     # 5. Combine results
     combined_result = {'segments': []}
     for result in all_results:
         combined_result['segments'].extend(result['segments'])
-    
+
     # 6. Process df and save (always use word mode now, segment mode switch removed)
     df = process_transcription(combined_result)
     save_results(df, is_segment_mode=False)
-    
+
     # 7. Save segment-level timestamps (for CJK languages)
     save_segments(combined_result)
-        
+
 if __name__ == "__main__":
-    transcribe()
\ No newline at end of file
+    transcribe()
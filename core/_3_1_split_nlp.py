@@ -6,9 +6,8 @@ from core.utils import check_file_exists
 def split_by_spacy():
     nlp = init_nlp()
     split_by_mark(nlp)
-    split_by_comma_main(nlp)
-    split_sentences_main(nlp)
-    split_long_by_root_main(nlp)
+    # comma, connector and root passes share one parse per sentence
+    split_marked_sentences(nlp)
     return
 
 if __name__ == '__main__':
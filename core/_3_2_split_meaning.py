@@ -1,5 +1,6 @@
 import concurrent.futures
 from difflib import SequenceMatcher
+from bisect import bisect_right
 import math
 from core.prompts import get_split_prompt
 from core.spacy_utils.load_nlp_model import init_nlp
@@ -11,38 +12,70 @@ from core.utils.models import _3_1_SPLIT_BY_NLP, _3_2_SPLIT_BY_MEANING
 console = Console()
 
 def tokenize_sentence(sentence, nlp):
-    doc = nlp(sentence)
+    doc = nlp.make_doc(sentence)
     return [token.text for token in doc]
 
+def count_tokens(sentences, nlp, token_counts):
+    """Token count of every sentence; only sentences missing from `token_counts` are tokenized, in one batch."""
+    missing = [s for s in dict.fromkeys(sentences) if s not in token_counts]
+    # counting only needs the tokenizer, not the tagger / parser
+    for sentence, doc in zip(missing, nlp.tokenizer.pipe(missing, batch_size=256)):
+        token_counts[sentence] = len(doc)
+    return [token_counts[s] for s in sentences]
+
+def _normalize_with_index(text):
+    """Lowercased word characters of `text` and the index of each in `text`"""
+    chars, index = [], []
+    for i, ch in enumerate(text):
+        if ch.isalnum():
+            chars.append(ch.lower())
+            index.append(i)
+    return ''.join(chars), index
+
 def find_split_positions(original, modified):
+    """Map the [br] markers of the LLM output back to character positions in the original sentence.
+
+    Both sides are reduced to word characters; the boundaries between parts are then carried over
+    through the matching blocks of a single alignment, so the cost no longer grows with every candidate index.
+    """
     split_positions = []
     parts = modified.split('[br]')
-    start = 0
-    whisper_language = load_key("whisper.language")
-    language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language
-    joiner = get_joiner(language)
-
-    for i in range(len(parts) - 1):
-        max_similarity = 0
-        best_split = None
-
-        for j in range(start, len(original)):
-            original_left = original[start:j]
-            modified_left = joiner.join(parts[i].split())
-
-            left_similarity = SequenceMatcher(None, original_left, modified_left).ratio()
-
-            if left_similarity > max_similarity:
-                max_similarity = left_similarity
-                best_split = j
-
-        if max_similarity < 0.9:
-            console.print(f"[yellow]Warning: low similarity found at the best split point: {max_similarity}[/yellow]")
-        if best_split is not None:
-            split_positions.append(best_split)
-            start = best_split
-        else:
+    norm_orig, orig_index = _normalize_with_index(original)
+    norm_parts = [_normalize_with_index(part)[0] for part in parts]
+    norm_mod = ''.join(norm_parts)
+    if not norm_orig:
+        return split_positions
+
+    if norm_orig == norm_mod:
+        def to_orig(pos):
+            return pos
+        similarity = 1.0
+    else:
+        blocks = [b for b in SequenceMatcher(None, norm_orig, norm_mod, autojunk=False).get_matching_blocks() if b.size]
+        similarity = 2 * sum(b.size for b in blocks) / (len(norm_orig) + len(norm_mod))
+        block_starts = [b.b for b in blocks]
+
+        def to_orig(pos):
+            # the block containing pos, or the nearest one before it
+            i = bisect_right(block_starts, pos) - 1
+            if i < 0:
+                return 0
+            block = blocks[i]
+            return block.a + min(pos - block.b, block.size)
+
+    if similarity < 0.9:
+        console.print(f"[yellow]Warning: low similarity found at the best split point: {similarity}[/yellow]")
+
+    boundary = 0
+    for i, part in enumerate(norm_parts[:-1]):
+        boundary += len(part)
+        pos = to_orig(boundary)
+        # split right before the first character of the next part, trailing punctuation stays left
+        split_at = orig_index[pos] if pos < len(orig_index) else None
+        if split_at is None or (split_positions and split_at <= split_positions[-1]) or split_at == 0:
             console.print(f"[yellow]Warning: Unable to find a suitable split point for the {i+1}th part.[/yellow]")
+            continue
+        split_positions.append(split_at)
 
     return split_positions
 
@@ -84,10 +117,13 @@ def split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0
     
     return best_split
 
-def parallel_split_sentences(sentences, max_length, max_workers, nlp, retry_attempt=0):
-    """Split sentences in parallel using a thread pool."""
+def parallel_split_sentences(sentences, max_length, max_workers, nlp, retry_attempt=0, token_counts=None):
+    """Split sentences in parallel using a thread pool, only sentences over `max_length` tokens go to the LLM."""
     new_sentences = [None] * len(sentences)
     futures = []
+    # reused across passes, so only the pieces produced by the previous pass are tokenized again
+    token_counts = {} if token_counts is None else token_counts
+    lengths = count_tokens(sentences, nlp, token_counts)
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
         for index, sentence in enumerate(sentences):
@@ -96,11 +132,9 @@ def parallel_split_sentences(sentences, max_length, max_workers, nlp, retry_atte
                 executor.shutdown(wait=False, cancel_futures=True)
                 raise CancelledError("Processing was cancelled by user")
             
-            # Use tokenizer to split the sentence
-            tokens = tokenize_sentence(sentence, nlp)
-            # print("Tokenization result:", tokens)
-            num_parts = math.ceil(len(tokens) / max_length)
-            if len(tokens) > max_length:
+            num_tokens = lengths[index]
+            num_parts = math.ceil(num_tokens / max_length)
+            if num_tokens > max_length:
                 future = executor.submit(split_sentence, sentence, num_parts, max_length, index=index, retry_attempt=retry_attempt)
                 futures.append((future, index, num_parts, sentence))
             else:
@@ -135,9 +169,13 @@ def split_sentences_by_meaning():
         sentences = [line.strip() for line in f.readlines()]
 
     nlp = init_nlp()
+    max_length = load_key("max_split_length")
+    token_counts = {}
     # 🔄 process sentences multiple times to ensure all are split
     for retry_attempt in range(3):
-        sentences = parallel_split_sentences(sentences, max_length=load_key("max_split_length"), max_workers=load_key("max_workers"), nlp=nlp, retry_attempt=retry_attempt)
+        if all(n <= max_length for n in count_tokens(sentences, nlp, token_counts)):
+            break
+        sentences = parallel_split_sentences(sentences, max_length=max_length, max_workers=get_llm_concurrency(), nlp=nlp, retry_attempt=retry_attempt, token_counts=token_counts)
 
     # 💾 save results
     with open(_3_2_SPLIT_BY_MEANING, 'w', encoding='utf-8') as f:
@@ -4,6 +4,7 @@ from core.prompts import get_summary_prompt
 import pandas as pd
 from core.utils import *
 from core.utils.models import _3_2_SPLIT_BY_MEANING, _4_1_TERMINOLOGY
+from core.utils.term_matcher import TermMatcher
 
 CUSTOM_TERMS_PATH = 'custom_terms.xlsx'
 
@@ -15,17 +16,30 @@ def combine_chunks():
     combined_text = ' '.join(cleaned_sentences)
     return combined_text[:load_key('summary_length')]  #! Return only the first x characters
 
+# Single-entry cache: (file stamp, terms, matcher), rebuilt when terminology.json changes
+_terminology_cache = (None, None, None)
+
+def load_terminology_matcher():
+    """Terms from terminology.json and a matcher compiled over their `src`, loaded once per file version"""
+    global _terminology_cache
+    stat = os.stat(_4_1_TERMINOLOGY)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if _terminology_cache[0] != stamp:
+        with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
+            terms = json.load(file)['terms']
+        _terminology_cache = (stamp, terms, TermMatcher(term['src'] for term in terms))
+    return _terminology_cache[1], _terminology_cache[2]
+
 def search_things_to_note_in_prompt(sentence):
     """Search for terms to note in the given sentence"""
-    with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
-        things_to_note = json.load(file)
-    things_to_note_list = [term['src'] for term in things_to_note['terms'] if term['src'].lower() in sentence.lower()]
-    if things_to_note_list:
+    terms, matcher = load_terminology_matcher()
+    matched_srcs = {terms[i]['src'] for i in matcher.find(sentence)}
+    if matched_srcs:
         prompt = '\n'.join(
             f'{i+1}. "{term["src"]}": "{term["tgt"]}",'
             f' meaning: {term["note"]}'
-            for i, term in enumerate(things_to_note['terms'])
-            if term['src'] in things_to_note_list
+            for i, term in enumerate(terms)
+            if term['src'] in matched_srcs
         )
         return prompt
     else:
@@ -3,14 +3,18 @@ import json
 import concurrent.futures
 from core.translate_lines import translate_lines
 from core._4_1_summarize import search_things_to_note_in_prompt
-from core._8_1_audio_task import check_len_then_trim
-from core._6_gen_sub import align_timestamp
+from core._8_1_audio_task import trim_over_long_texts
+from core._6_gen_sub import align_timestamp, get_word_aligner, remove_punctuation
 from core.utils import *
 from rich.console import Console
 from difflib import SequenceMatcher
 from core.utils.models import *
+from core.utils.table_io import read_table, write_table
 console = Console()
 
+# LLM origin sentences scored around the expected position when no exact text match exists
+ORIGIN_WINDOW = 20
+
 # Function to split text into chunks
 def split_chunks_by_chars(chunk_size, max_i): 
     """Split text into chunks based on character count, return a list of multi-line text chunks"""
@@ -49,6 +53,89 @@ def translate_chunk(chunk, chunks, theme_prompt, i):
 def similar(a, b):
     return SequenceMatcher(None, a, b).ratio()
 
+def check_chunk_result(i, chunk, result):
+    """Make sure the result returned for chunk i was produced from that chunk's source lines"""
+    chunk_text = chunk.replace('\n', '').lower()
+    result_text = result[1].replace('\n', '').lower()
+    if result_text == chunk_text:
+        return
+    similarity = similar(result_text, chunk_text)
+    if similarity < 0.9:
+        console.print(f"[yellow]Warning: No matching translation found for chunk {i}[/yellow]")
+        raise ValueError(f"Translation matching failed (chunk {i})")
+    console.print(f"[yellow]Warning: Similar match found (chunk {i}, similarity: {similarity:.3f})[/yellow]")
+
+def _clean_cjk(text):
+    return remove_punctuation(str(text).lower()).replace(" ", "")
+
+def match_origin(clean_src, clean_origins, used, exact_index, cursor, min_similarity=0.8):
+    """Index of the unused LLM origin sentence matching a source row, or -1.
+
+    Exact text is a dict lookup; otherwise only origins within ORIGIN_WINDOW of the cursor are scored,
+    since origins come back in transcript order.
+    """
+    for oi in exact_index.get(clean_src, ()):
+        if not used[oi]:
+            return oi
+
+    best_idx, best_similarity = -1, min_similarity
+    matcher = SequenceMatcher(None, autojunk=False)
+    matcher.set_seq2(clean_src)
+    for oi in range(max(0, cursor - ORIGIN_WINDOW), min(len(clean_origins), cursor + ORIGIN_WINDOW)):
+        if used[oi]:
+            continue
+        matcher.set_seq1(clean_origins[oi])
+        # cheap upper bounds first, the full ratio only for plausible candidates
+        if matcher.real_quick_ratio() <= best_similarity or matcher.quick_ratio() <= best_similarity:
+            continue
+        similarity = matcher.ratio()
+        if similarity > best_similarity:
+            best_idx, best_similarity = oi, similarity
+    return best_idx
+
+def reanchor_cjk_timestamps(df_text, df_time, origin_sentences):
+    """Correct row timestamps in place from where the LLM's origin sentences sit in the ASR words, returns the number of rows adjusted"""
+    aligner = get_word_aligner(df_text)
+    clean_origins = [_clean_cjk(origin) for origin in origin_sentences]
+    exact_index = {}
+    for oi, clean_origin in enumerate(clean_origins):
+        exact_index.setdefault(clean_origin, []).append(oi)
+    used = [False] * len(clean_origins)
+
+    adjustments_made = 0
+    cursor = 0  # next origin expected
+    text_pos = 0  # end of the last located origin in the ASR text
+    for i, src_sentence, old_start, old_end in zip(df_time.index, df_time['Source'], df_time['start'], df_time['end']):
+        clean_src = _clean_cjk(src_sentence)
+        if not clean_src:
+            continue
+        oi = match_origin(clean_src, clean_origins, used, exact_index, cursor)
+        if oi < 0:
+            continue
+        used[oi] = True
+        cursor = oi + 1
+        if not clean_origins[oi]:
+            continue
+
+        span = aligner.locate(clean_origins[oi], text_pos)
+        if span is None:
+            continue
+        text_pos = span[1]
+        start_word_idx, end_word_idx = aligner.word_span(span)
+        new_start = aligner.starts_sec[start_word_idx]
+        new_end = aligner.ends_sec[end_word_idx]
+        old_start, old_end = float(old_start), float(old_end)
+
+        # Adjust if there's a meaningful difference (more than 0.1 second)
+        if abs(new_start - old_start) > 0.1 or abs(new_end - old_end) > 0.1:
+            # Only adjust if the difference is reasonable (within 3 seconds)
+            if abs(new_start - old_start) < 3.0 and abs(new_end - old_end) < 3.0:
+                df_time.at[i, 'start'] = new_start
+                df_time.at[i, 'end'] = new_end
+                df_time.at[i, 'duration'] = new_end - new_start
+                adjustments_made += 1
+    return adjustments_made
+
 # 🚀 Main function to translate all chunks
 @check_file_exists(_4_2_TRANSLATION)
 def translate_all():
@@ -70,7 +157,7 @@ def translate_all():
     # 🔄 Use concurrent execution for translation
     # Note: Avoid using Rich Progress/Live here as it conflicts with stdout capture in processing_service
     console.print(f"[cyan]Translating {len(chunks)} chunks...[/cyan]")
-    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=get_llm_concurrency()) as executor:
         futures = []
         for i, chunk in enumerate(chunks):
             future = executor.submit(translate_chunk, chunk, chunks, theme_prompt, i)
@@ -118,24 +205,16 @@ def translate_all():
         console.print("[blue]📝 CJK mode: Using NLP split sentences with align_timestamp[/blue]")
     
     # Same logic for both CJK and non-CJK: use NLP split sentences
+    # results carry the index of the chunk they were submitted for
+    missing = sorted(set(range(len(chunks))) - {r[0] for r in results})
+    if missing:
+        raise ValueError(f"Translation results missing for chunks {missing}")
     for i, chunk in enumerate(chunks):
         chunk_lines = chunk.split('\n')
         src_text.extend(chunk_lines)
-        
-        # Calculate similarity between current chunk and translation results
-        chunk_text = ''.join(chunk_lines).lower()
-        matching_results = [(r, similar(''.join(r[1].split('\n')).lower(), chunk_text)) 
-                          for r in results]
-        best_match = max(matching_results, key=lambda x: x[1])
-        
-        # Check similarity and handle exceptions
-        if best_match[1] < 0.9:
-            console.print(f"[yellow]Warning: No matching translation found for chunk {i}[/yellow]")
-            raise ValueError(f"Translation matching failed (chunk {i})")
-        elif best_match[1] < 1.0:
-            console.print(f"[yellow]Warning: Similar match found (chunk {i}, similarity: {best_match[1]:.3f})[/yellow]")
-            
-        trans_text.extend(best_match[0][2].split('\n'))
+        result = results[i]
+        check_chunk_result(i, chunk, result)
+        trans_text.extend(result[2].split('\n'))
     
     # Ensure src_text and trans_text have same length
     if len(src_text) != len(trans_text):
@@ -149,7 +228,7 @@ def translate_all():
             src_text.extend([''] * (len(trans_text) - len(src_text)))
     
     # Trim long translation text
-    df_text = pd.read_excel(_2_CLEANED_CHUNKS)
+    df_text = read_table(_2_CLEANED_CHUNKS)
     df_text['text'] = df_text['text'].str.strip('"').str.strip()
     df_translate = pd.DataFrame({'Source': src_text, 'Translation': trans_text})
     subtitle_output_configs = [('trans_subs_for_audio.srt', ['Translation'])]
@@ -165,73 +244,7 @@ def translate_all():
         console.print("[blue]📝 Step 2: Adjusting timestamps based on LLM origin sentences[/blue]")
         
         try:
-            import re
-            # Build character-to-word mapping from ASR output
-            full_text = ''
-            char_to_word_idx = {}
-            
-            for idx, row in df_text.iterrows():
-                word = str(row['text']).strip()
-                clean_word = re.sub(r'[^\w]', '', word)
-                start_pos = len(full_text)
-                full_text += clean_word
-                for pos in range(start_pos, len(full_text)):
-                    char_to_word_idx[pos] = idx
-            
-            # For each row, try to find matching origin sentence and adjust timestamps
-            adjustments_made = 0
-            used_origins = set()  # Track which origins have been used
-            
-            for i, row in df_time.iterrows():
-                src_sentence = str(row['Source']).strip()
-                clean_src = re.sub(r'[^\w]', '', src_sentence)
-                
-                if not clean_src:
-                    continue
-                
-                # Find best matching origin sentence (that hasn't been used yet)
-                best_origin = None
-                best_similarity = 0.8  # Minimum threshold
-                best_origin_idx = -1
-                
-                for oi, origin in enumerate(origin_sentences):
-                    if oi in used_origins:
-                        continue
-                    clean_origin = re.sub(r'[^\w]', '', origin)
-                    sim = similar(clean_src, clean_origin)
-                    if sim > best_similarity:
-                        best_similarity = sim
-                        best_origin = origin
-                        best_origin_idx = oi
-                
-                if best_origin and best_origin_idx >= 0:
-                    used_origins.add(best_origin_idx)
-                    clean_origin = re.sub(r'[^\w]', '', best_origin)
-                    
-                    # Search for origin in full_text to get more precise timestamps
-                    search_pos = 0
-                    while search_pos <= len(full_text) - len(clean_origin):
-                        if full_text[search_pos:search_pos + len(clean_origin)] == clean_origin:
-                            start_word_idx = char_to_word_idx.get(search_pos, 0)
-                            end_word_idx = char_to_word_idx.get(search_pos + len(clean_origin) - 1, len(df_text) - 1)
-                            
-                            new_start = float(df_text.iloc[start_word_idx]['start'])
-                            new_end = float(df_text.iloc[end_word_idx]['end'])
-                            
-                            old_start = float(row['start'])
-                            old_end = float(row['end'])
-                            
-                            # Adjust if there's a meaningful difference (more than 0.1 second)
-                            if abs(new_start - old_start) > 0.1 or abs(new_end - old_end) > 0.1:
-                                # Only adjust if the difference is reasonable (within 3 seconds)
-                                if abs(new_start - old_start) < 3.0 and abs(new_end - old_end) < 3.0:
-                                    df_time.at[i, 'start'] = new_start
-                                    df_time.at[i, 'end'] = new_end
-                                    df_time.at[i, 'duration'] = new_end - new_start
-                                    adjustments_made += 1
-                            break
-                        search_pos += 1
-            
+            adjustments_made = reanchor_cjk_timestamps(df_text, df_time, origin_sentences)
             if adjustments_made > 0:
                 console.print(f"[green]✅ CJK: Made {adjustments_made} timestamp adjustments based on LLM origins[/green]")
             else:
@@ -241,11 +254,11 @@ def translate_all():
             console.print(f"[yellow]⚠️ CJK adjustment failed: {e}, keeping original timestamps[/yellow]")
     
     console.print(df_time)
-    # apply check_len_then_trim to df_time['Translation'], only when duration > MIN_TRIM_DURATION.
-    df_time['Translation'] = df_time.apply(lambda x: check_len_then_trim(x['Translation'], x['duration']) if x['duration'] > load_key("min_trim_duration") else x['Translation'], axis=1)
+    # trim translations too long for their slot, only when duration > MIN_TRIM_DURATION; over-long rows are trimmed concurrently
+    df_time['Translation'] = trim_over_long_texts(df_time['Translation'].tolist(), df_time['duration'].tolist(), load_key("min_trim_duration"))
     console.print(df_time)
     
-    df_time.to_excel(_4_2_TRANSLATION, index=False)
+    write_table(df_time, _4_2_TRANSLATION)
     console.print("[bold green]✅ Translation completed and results saved.[/bold green]")
 
 if __name__ == '__main__':
@@ -1,34 +1,202 @@
 import pandas as pd
+import unicodedata
+import numpy as np
 from typing import List, Tuple
 import concurrent.futures
 
 from core._3_2_split_meaning import split_sentence
+from core.spacy_utils.load_nlp_model import init_nlp
 from core.prompts import get_align_prompt
 from rich.panel import Panel
 from rich.console import Console
 from rich.table import Table
 from core.utils import *
 from core.utils.models import *
+from core.utils.table_io import read_table, write_table
 console = Console()
 
 # ! You can modify your own weights here
 # Chinese and Japanese 2.5 characters, Korean 2 characters, Thai 1.5 characters, full-width symbols 2 characters, other English-based and half-width symbols 1 character
+WIDE_RANGES = [(0x4E00, 0x9FFF), (0x3040, 0x30FF), (0xFF01, 0xFF5E)]  # Chinese and Japanese, full-width symbols
+WIDE_WEIGHT = 1.75
+KOREAN_RANGES = [(0xAC00, 0xD7A3), (0x1100, 0x11FF)]
+KOREAN_WEIGHT = 1.5
+# everything else (English, half-width symbols, Thai) weighs 1
+
+# per-codepoint weight table, every codepoint past the BMP weighs 1
+_WEIGHTS = np.ones(0x10001)
+for start, end in WIDE_RANGES:
+    _WEIGHTS[start:end + 1] = WIDE_WEIGHT
+for start, end in KOREAN_RANGES:
+    _WEIGHTS[start:end + 1] = KOREAN_WEIGHT
+
 def calc_len(text: str) -> float:
     text = str(text) # force convert
-    def char_weight(char):
-        code = ord(char)
-        if 0x4E00 <= code <= 0x9FFF or 0x3040 <= code <= 0x30FF:  # Chinese and Japanese
-            return 1.75
-        elif 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF:  # Korean
-            return 1.5
-        elif 0x0E00 <= code <= 0x0E7F:  # Thai
-            return 1
-        elif 0xFF01 <= code <= 0xFF5E:  # full-width symbols
-            return 1.75
-        else:  # other characters (e.g. English and half-width symbols)
-            return 1
-
-    return sum(char_weight(char) for char in text)
+    if text.isascii():
+        return len(text)
+    total = float(char_weights(text).sum())
+    # plain int like a sum of unit weights, when nothing is wide
+    return len(text) if total == len(text) else total
+
+def char_weights(text: str) -> np.ndarray:
+    """calc_len weight of every character of `text`"""
+    codes = np.frombuffer(str(text).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    return _WEIGHTS[np.minimum(codes, 0x10000)]
+
+def calc_len_column(texts) -> np.ndarray:
+    """calc_len of every text at once, from one weight lookup over the concatenated column"""
+    texts = [str(text) for text in texts]
+    lengths = np.array([len(text) for text in texts], dtype=int)
+    ends = np.cumsum(lengths)
+    cumulative = np.concatenate([[0.0], np.cumsum(char_weights(''.join(texts)))])
+    return cumulative[ends] - cumulative[ends - lengths]
+
+# ------------
+# local splitter
+# ------------
+
+# Cut penalties by boundary kind; a cut after sentence punctuation is free, inside a word is the last resort
+BREAK_PENALTY = {'strong': 0.0, 'weak': 0.05, 'word': 0.2, 'char': 0.6}
+STRONG_BREAKS = set('。！？!?；;…')
+WEAK_BREAKS = set('，、,:：')
+# Weight of the squared deviation of a cut from its target length ratio
+BALANCE_WEIGHT = 4.0
+# Lines whose best local split costs more than this (per cut, on either side) go to the LLM
+LOCAL_SPLIT_MAX_COST = 0.25
+# Largest difference between the length ratios of a source cut and its translation cut
+MAX_RATIO_DRIFT = 0.15
+
+def _break_candidates(text: str, word_starts=()) -> dict:
+    """{cut position: penalty}, cutting at pos puts text[:pos] and text[pos:] on separate lines"""
+    n = len(text)
+    # never start a line with punctuation
+    candidates = {pos: BREAK_PENALTY['word'] for pos in word_starts if 0 < pos < n and unicodedata.category(text[pos])[0] != 'P'}
+    has_space = False
+    for i, ch in enumerate(text[:-1]):
+        nxt = text[i + 1]
+        if ch.isspace():
+            has_space = True
+            if unicodedata.category(nxt)[0] == 'P':
+                continue
+            candidates[i + 1] = min(candidates.get(i + 1, 1.0), BREAK_PENALTY['word'])
+        # a full stop only ends a sentence before whitespace, not inside numbers or abbreviations like e.g.
+        elif ch == '.' and nxt.isspace():
+            candidates[i + 1] = BREAK_PENALTY['strong']
+        # cut after a run of punctuation, not inside it
+        elif (ch in STRONG_BREAKS or ch in WEAK_BREAKS) and nxt not in STRONG_BREAKS and nxt not in WEAK_BREAKS and unicodedata.category(nxt)[0] != 'P':
+            candidates[i + 1] = BREAK_PENALTY['strong' if ch in STRONG_BREAKS else 'weak']
+    if not has_space and not word_starts:
+        # unsegmented CJK text, any character boundary will do
+        for pos in range(1, n):
+            candidates.setdefault(pos, BREAK_PENALTY['char'])
+    return candidates
+
+def _dp_cuts(text: str, candidates: dict, targets: List[float]):
+    """
+    One cut per target length ratio, increasing, minimising boundary penalty plus BALANCE_WEIGHT * (ratio - target)^2.
+    Returns (cuts, mean cost per cut), or (None, inf) when there are not enough candidates.
+    """
+    positions = sorted(candidates)
+    if len(positions) < len(targets):
+        return None, float('inf')
+    prefix = np.cumsum(char_weights(text)).tolist()
+    total = prefix[-1] or 1.0
+
+    def cut_cost(pos, target):
+        return candidates[pos] + BALANCE_WEIGHT * (prefix[pos - 1] / total - target) ** 2
+
+    # cost[c]: best total with the current cut at positions[c]; back[j][c]: position index of cut j - 1
+    cost = [cut_cost(pos, targets[0]) for pos in positions]
+    back = []
+    for target in targets[1:]:
+        best_prev, best_prev_idx = float('inf'), -1
+        new_cost, links = [], []
+        for c, pos in enumerate(positions):
+            new_cost.append(best_prev + cut_cost(pos, target))
+            links.append(best_prev_idx)
+            if cost[c] < best_prev:
+                best_prev, best_prev_idx = cost[c], c
+        cost = new_cost
+        back.append(links)
+
+    c = min(range(len(positions)), key=cost.__getitem__)
+    best = cost[c]
+    if best == float('inf'):
+        return None, best
+    cuts = [positions[c]]
+    for links in reversed(back):
+        c = links[c]
+        cuts.append(positions[c])
+    return cuts[::-1], best / len(targets)
+
+def _cut(text: str, cuts: List[int]) -> List[str]:
+    bounds = [0] + cuts + [len(text)]
+    return [text[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+
+def _break_ratios(text: str, cuts: List[int]) -> List[float]:
+    total = calc_len(text) or 1
+    return [calc_len(text[:cut]) / total for cut in cuts]
+
+def _is_punct_break(penalty: float) -> bool:
+    return penalty <= BREAK_PENALTY['weak']
+
+def _punct_break_near(text: str, candidates: dict, ratios: List[float]) -> bool:
+    """Whether `text` has a punctuation break within MAX_RATIO_DRIFT of any of the cut ratios"""
+    punct_cuts = [pos for pos, penalty in candidates.items() if _is_punct_break(penalty)]
+    return any(abs(punct_ratio - ratio) <= MAX_RATIO_DRIFT for punct_ratio in _break_ratios(text, punct_cuts) for ratio in ratios)
+
+def split_locally(src: str, tr: str, src_word_starts=(), num_parts: int = 2):
+    """
+    Split a subtitle pair without the LLM. Both sides are cut at the same kind of boundary, either
+    punctuation on both or plain word / character breaks on both, at matching length ratios:
+    the source into balanced parts at its best boundaries, the translation closest to the source ratios.
+    Plain cuts are refused when either side has a punctuation break near the cut, since the two halves
+    would then likely not correspond.
+    Returns (src_parts, tr_parts), or None when no pair of cuts is confident enough.
+    """
+    src_candidates, tr_candidates = _break_candidates(src, src_word_starts), _break_candidates(tr)
+    targets = [(j + 1) / num_parts for j in range(num_parts - 1)]
+    best = None
+    for punct in (True, False):
+        src_cuts, src_cost = _dp_cuts(src, {pos: p for pos, p in src_candidates.items() if _is_punct_break(p) == punct}, targets)
+        if src_cuts is None or src_cost > LOCAL_SPLIT_MAX_COST:
+            continue
+        src_ratios = _break_ratios(src, src_cuts)
+        tr_cuts, tr_cost = _dp_cuts(tr, {pos: p for pos, p in tr_candidates.items() if _is_punct_break(p) == punct}, src_ratios)
+        if tr_cuts is None or tr_cost > LOCAL_SPLIT_MAX_COST:
+            continue
+        tr_ratios = _break_ratios(tr, tr_cuts)
+        if any(abs(a - b) > MAX_RATIO_DRIFT for a, b in zip(src_ratios, tr_ratios)):
+            continue
+        if not punct and (_punct_break_near(src, src_candidates, src_ratios) or _punct_break_near(tr, tr_candidates, tr_ratios)):
+            continue
+        if best is None or src_cost + tr_cost < best[0]:
+            best = (src_cost + tr_cost, src_cuts, tr_cuts)
+    if best is None:
+        return None
+    src_parts, tr_parts = _cut(src, best[1]), _cut(tr, best[2])
+    if not all(src_parts) or not all(tr_parts):
+        return None
+    return src_parts, tr_parts
+
+def _word_starts(doc, spaced: bool = True) -> List[int]:
+    """
+    Token offsets usable as cuts. In space-separated languages only tokens after whitespace,
+    so clitics and affixes (n't, 's) stay attached to their word.
+    """
+    return [token.idx for token in doc if not spaced or (token.i > 0 and doc[token.i - 1].whitespace_)]
+
+def _source_word_starts(lines: List[str]) -> List[List[int]]:
+    """Word start offsets of each source line from the spaCy tokenizer, empty when no model is available"""
+    whisper_language = load_key("whisper.language")
+    language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language
+    spaced = language not in load_key("language_split_without_space")
+    try:
+        nlp = init_nlp()
+        return [_word_starts(doc, spaced) for doc in nlp.tokenizer.pipe(lines)]
+    except Exception as e:
+        console.print(f"[yellow]⚠️ spaCy tokenizer unavailable for local splitting, using punctuation only: {e}[/yellow]")
+        return [[] for _ in lines]
 
 def align_subs(src_sub: str, tr_sub: str, src_part: str) -> Tuple[List[str], List[str], str]:
     align_prompt = get_align_prompt(src_sub, tr_sub, src_part)
@@ -64,18 +232,31 @@ def split_align_subs(src_lines: List[str], tr_lines: List[str]):
     TARGET_SUB_MULTIPLIER = subtitle_set["target_multiplier"]
     remerged_tr_lines = tr_lines.copy()
     
-    to_split = []
-    for i, (src, tr) in enumerate(zip(src_lines, tr_lines)):
-        src, tr = str(src), str(tr)
-        if len(src) > MAX_SUB_LENGTH or calc_len(tr) * TARGET_SUB_MULTIPLIER > MAX_SUB_LENGTH:
-            to_split.append(i)
-            table = Table(title=f"📏 Line {i} needs to be split")
-            table.add_column("Type", style="cyan")
-            table.add_column("Content", style="magenta")
-            table.add_row("Source Line", src)
-            table.add_row("Target Line", tr)
-            console.print(table)
+    src_too_long = np.array([len(str(src)) for src in src_lines]) > MAX_SUB_LENGTH
+    tr_too_long = calc_len_column(tr_lines) * TARGET_SUB_MULTIPLIER > MAX_SUB_LENGTH
+    to_split = np.flatnonzero(src_too_long | tr_too_long).tolist()
+    for i in to_split:
+        table = Table(title=f"📏 Line {i} needs to be split")
+        table.add_column("Type", style="cyan")
+        table.add_column("Content", style="magenta")
+        table.add_row("Source Line", str(src_lines[i]))
+        table.add_row("Target Line", str(tr_lines[i]))
+        console.print(table)
     
+    # lines with a clean local split skip both LLM round-trips
+    local_split = subtitle_set.get("local_split", True)
+    word_starts = dict(zip(to_split, _source_word_starts([str(src_lines[i]) for i in to_split]))) if local_split and to_split else {}
+    llm_lines = []
+    for i in to_split:
+        local = split_locally(str(src_lines[i]), str(tr_lines[i]), word_starts[i]) if local_split else None
+        if local is None:
+            llm_lines.append(i)
+            continue
+        remerged_tr_lines[i] = str(tr_lines[i])
+        src_lines[i], tr_lines[i] = local
+    if to_split:
+        console.print(f"[cyan]✂️ {len(to_split) - len(llm_lines)} lines split locally, {len(llm_lines)} sent to the LLM[/cyan]")
+
     @except_handler("Error in split_align_subs")
     def process(i):
         split_src = split_sentence(src_lines[i], num_parts=2).strip()
@@ -84,8 +265,8 @@ def split_align_subs(src_lines: List[str], tr_lines: List[str]):
         tr_lines[i] = tr_parts
         remerged_tr_lines[i] = tr_remerged
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
-        executor.map(process, to_split)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=get_llm_concurrency()) as executor:
+        executor.map(process, llm_lines)
     
     # Flatten `src_lines` and `tr_lines`
     src_lines = [item for sublist in src_lines for item in (sublist if isinstance(sublist, list) else [sublist])]
@@ -101,7 +282,7 @@ def split_align_subs(src_lines: List[str], tr_lines: List[str]):
 def split_for_sub_main():
     console.print("[bold green]🚀 Start splitting subtitles...[/bold green]")
     
-    df = pd.read_excel(_4_2_TRANSLATION)
+    df = read_table(_4_2_TRANSLATION)
     src = df['Source'].tolist()
     trans = df['Translation'].tolist()
     
@@ -115,7 +296,7 @@ def split_for_sub_main():
         
         # 检查是否所有字幕都符合长度要求
         if all(len(src) <= MAX_SUB_LENGTH for src in split_src) and \
-           all(calc_len(tr) * TARGET_SUB_MULTIPLIER <= MAX_SUB_LENGTH for tr in split_trans):
+           (calc_len_column(split_trans) * TARGET_SUB_MULTIPLIER <= MAX_SUB_LENGTH).all():
             break
         
         # 更新源数据继续下一轮分割
@@ -133,8 +314,8 @@ def split_for_sub_main():
     elif len(remerged) > len(src):
         src += [None] * (len(remerged) - len(src))
     
-    pd.DataFrame({'Source': split_src, 'Translation': split_trans}).to_excel(_5_SPLIT_SUB, index=False)
-    pd.DataFrame({'Source': src, 'Translation': remerged}).to_excel(_5_REMERGED, index=False)
+    write_table(pd.DataFrame({'Source': split_src, 'Translation': split_trans}), _5_SPLIT_SUB)
+    write_table(pd.DataFrame({'Source': src, 'Translation': remerged}), _5_REMERGED)
 
 if __name__ == '__main__':
     split_for_sub_main()
@@ -1,11 +1,17 @@
 import pandas as pd
 import os
 import re
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+from difflib import SequenceMatcher
 from rich.panel import Panel
 from rich.console import Console
 import autocorrect_py as autocorrect
 from core.utils import *
 from core.utils.models import *
+from core.utils.table_io import read_table
+from core.utils.subtitle_table import build_subtitle_table, write_subtitle_table, render_srt, ms_to_srt_time
 console = Console()
 
 SUBTITLE_OUTPUT_CONFIGS = [ 
@@ -22,16 +28,7 @@ AUDIO_SUBTITLE_OUTPUT_CONFIGS = [
 
 def convert_to_srt_format(start_time, end_time):
     """Convert time (in seconds) to the format: hours:minutes:seconds,milliseconds"""
-    def seconds_to_hmsm(seconds):
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = seconds % 60
-        milliseconds = int(seconds * 1000) % 1000
-        return f"{hours:02d}:{minutes:02d}:{int(seconds):02d},{milliseconds:03d}"
-
-    start_srt = seconds_to_hmsm(start_time)
-    end_srt = seconds_to_hmsm(end_time)
-    return f"{start_srt} --> {end_srt}"
+    return f"{ms_to_srt_time(round(start_time * 1000))} --> {ms_to_srt_time(round(end_time * 1000))}"
 
 def remove_punctuation(text):
     text = re.sub(r'\s+', ' ', text)
@@ -56,51 +53,114 @@ def show_difference(str1, str2):
     print("Position markers: " + "".join("^" if i in diff_positions else " " for i in range(max(len(str1), len(str2)))))
     print(f"Difference indices: {diff_positions}")
 
+class WordAligner:
+    """Maps cleaned sentence text onto word-level timestamps.
+
+    The cleaned words are concatenated once; `ends[i]` is the offset just past word i,
+    so the word covering a character is found with bisect instead of a per-character dict.
+    """
+
+    # Fuzzy fallback looks at most this far past the expected position
+    FUZZY_WINDOW = 200
+    FUZZY_MIN_RATIO = 0.8
+    # A fuzzy span may be this much shorter or longer than the sentence
+    FUZZY_LENGTH_TOLERANCE = 0.2
+
+    def __init__(self, df_words):
+        clean_words = [remove_punctuation(str(word).lower()) for word in df_words['text']]
+        self.text = ''.join(clean_words)
+        self.ends = list(accumulate(len(word) for word in clean_words))
+        self.starts_sec = df_words['start'].astype(float).tolist()
+        self.ends_sec = df_words['end'].astype(float).tolist()
+        self.speakers = df_words['speaker_id'].tolist() if 'speaker_id' in df_words.columns else None
+
+    def word_at(self, pos):
+        return bisect_right(self.ends, pos)
+
+    def _fuzzy_find(self, clean_sentence, current_pos):
+        """Best approximate span within a bounded window, (start, end) or None"""
+        window = self.text[current_pos:current_pos + 2 * len(clean_sentence) + self.FUZZY_WINDOW]
+        matcher = SequenceMatcher(None, window, clean_sentence, autojunk=False)
+        blocks = [b for b in matcher.get_matching_blocks() if b.size]
+        max_len = len(clean_sentence) * (1 + self.FUZZY_LENGTH_TOLERANCE)
+        # stray blocks far from the main match would stretch the span past the sentence, drop them from the ends
+        while len(blocks) > 1 and blocks[-1].a + blocks[-1].size - blocks[0].a > max_len:
+            lead_gap = blocks[1].a - (blocks[0].a + blocks[0].size)
+            tail_gap = blocks[-1].a - (blocks[-2].a + blocks[-2].size)
+            blocks = blocks[1:] if lead_gap > tail_gap else blocks[:-1]
+        if not blocks or sum(b.size for b in blocks) < self.FUZZY_MIN_RATIO * len(clean_sentence):
+            return None
+        span_len = blocks[-1].a + blocks[-1].size - blocks[0].a
+        if not len(clean_sentence) * (1 - self.FUZZY_LENGTH_TOLERANCE) <= span_len <= max_len:
+            return None
+        return current_pos + blocks[0].a, current_pos + blocks[-1].a + blocks[-1].size
+
+    def locate(self, clean_sentence, current_pos=0):
+        """(start, end) character span of a cleaned sentence at or after current_pos, exact first then fuzzy, or None"""
+        match_start = self.text.find(clean_sentence, current_pos)
+        if match_start >= 0:
+            return match_start, match_start + len(clean_sentence)
+        return self._fuzzy_find(clean_sentence, current_pos)
+
+    def word_span(self, span):
+        """(first word index, last word index) covering a character span"""
+        return self.word_at(span[0]), self.word_at(span[1] - 1)
+
+    def align_words(self, sentences):
+        """(first word index, last word index) for each sentence, matched in order"""
+        word_spans = []
+        current_pos = 0
+        for sentence in sentences:
+            clean_sentence = remove_punctuation(sentence.lower()).replace(" ", "")
+            if not clean_sentence:
+                # nothing to match, pin to the current word
+                idx = min(self.word_at(current_pos), len(self.ends) - 1)
+                word_spans.append((idx, idx))
+                continue
+
+            span = self.locate(clean_sentence, current_pos)
+            if span is None:
+                print(f"\n⚠️ Warning: No exact match found for sentence: {sentence}")
+                show_difference(clean_sentence, self.text[current_pos:current_pos + len(clean_sentence)])
+                print("\nOriginal sentence:", sentence)
+                raise ValueError("❎ No match found for sentence.")
+            if self.text[span[0]:span[1]] != clean_sentence:
+                print(f"⚠️ Fuzzy matched sentence: {sentence}")
+
+            word_spans.append(self.word_span(span))
+            current_pos = span[1]
+        return word_spans
+
+    def align(self, sentences):
+        """(start, end) seconds for each sentence, matched in order"""
+        return [(self.starts_sec[a], self.ends_sec[b]) for a, b in self.align_words(sentences)]
+
+    def speakers_for(self, word_spans):
+        """Most frequent speaker over each word span, None without speaker labels"""
+        if self.speakers is None:
+            return None
+        result = []
+        for a, b in word_spans:
+            labels = [s for s in self.speakers[a:b + 1] if not pd.isna(s)]
+            result.append(Counter(labels).most_common(1)[0][0] if labels else None)
+        return result
+
+
+# Single-entry cache: the same word table is aligned by translation and both subtitle passes
+_aligner_cache = (None, None)
+
+def get_word_aligner(df_words):
+    """Aligner for a word table, rebuilt only when its content changes"""
+    global _aligner_cache
+    key = (len(df_words), int(pd.util.hash_pandas_object(df_words[['text', 'start', 'end']], index=False).sum()))
+    if _aligner_cache[0] != key:
+        _aligner_cache = (key, WordAligner(df_words))
+    return _aligner_cache[1]
+
 def get_sentence_timestamps(df_words, df_sentences):
-    time_stamp_list = []
-    
-    # Build complete string and position mapping
-    full_words_str = ''
-    position_to_word_idx = {}
-    
-    for idx, word in enumerate(df_words['text']):
-        clean_word = remove_punctuation(word.lower())
-        start_pos = len(full_words_str)
-        full_words_str += clean_word
-        for pos in range(start_pos, len(full_words_str)):
-            position_to_word_idx[pos] = idx
-    
-    current_pos = 0
-    for idx, sentence in df_sentences['Source'].items():
-        clean_sentence = remove_punctuation(sentence.lower()).replace(" ", "")
-        sentence_len = len(clean_sentence)
-        
-        match_found = False
-        while current_pos <= len(full_words_str) - sentence_len:
-            if full_words_str[current_pos:current_pos+sentence_len] == clean_sentence:
-                start_word_idx = position_to_word_idx[current_pos]
-                end_word_idx = position_to_word_idx[current_pos + sentence_len - 1]
-                
-                time_stamp_list.append((
-                    float(df_words['start'][start_word_idx]),
-                    float(df_words['end'][end_word_idx])
-                ))
-                
-                current_pos += sentence_len
-                match_found = True
-                break
-            current_pos += 1
-            
-        if not match_found:
-            print(f"\n⚠️ Warning: No exact match found for sentence: {sentence}")
-            show_difference(clean_sentence, 
-                          full_words_str[current_pos:current_pos+len(clean_sentence)])
-            print("\nOriginal sentence:", df_sentences['Source'][idx])
-            raise ValueError("❎ No match found for sentence.")
-    
-    return time_stamp_list
+    return get_word_aligner(df_words).align(df_sentences['Source'].tolist())
 
-def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output_dir: str, for_display: bool = True, keep_numeric: bool = False):
+def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output_dir: str, for_display: bool = True, keep_numeric: bool = False, table_path: str = None):
     """Align timestamps and add a new timestamp column to df_translate
     
     Args:
@@ -110,6 +170,7 @@ def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output
         output_dir: Directory to output SRT files (None to skip output)
         for_display: Whether to polish subtitles for display
         keep_numeric: If True, keep start/end as numeric values instead of converting to SRT format
+        table_path: Where to persist the subtitle table (None to skip), SRT files are rendered from the same table
     """
     df_trans_time = df_translate.copy()
 
@@ -119,7 +180,9 @@ def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output
     words['id'] = words['id'].astype(int)
 
     # Process timestamps ⏰
-    time_stamp_list = get_sentence_timestamps(df_text, df_translate)
+    aligner = get_word_aligner(df_text)
+    word_spans = aligner.align_words(df_translate['Source'].tolist())
+    time_stamp_list = [(aligner.starts_sec[a], aligner.ends_sec[b]) for a, b in word_spans]
     df_trans_time['timestamp'] = time_stamp_list
     df_trans_time['duration'] = df_trans_time['timestamp'].apply(lambda x: x[1] - x[0])
 
@@ -128,6 +191,7 @@ def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output
         delta_time = df_trans_time.loc[i+1, 'timestamp'][0] - df_trans_time.loc[i, 'timestamp'][1]
         if 0 < delta_time < 1:
             df_trans_time.at[i, 'timestamp'] = (df_trans_time.loc[i, 'timestamp'][0], df_trans_time.loc[i+1, 'timestamp'][0])
+    numeric_timestamps = df_trans_time['timestamp'].tolist()
 
     if keep_numeric:
         # Keep start and end as separate numeric columns
@@ -143,15 +207,19 @@ def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output
         df_trans_time['Translation'] = df_trans_time['Translation'].apply(lambda x: re.sub(r'[，。]', ' ', x).strip())
 
     # Output subtitles 📜
-    def generate_subtitle_string(df, columns):
-        return ''.join([f"{i+1}\n{row['timestamp']}\n{row[columns[0]].strip()}\n{row[columns[1]].strip() if len(columns) > 1 else ''}\n\n" for i, row in df.iterrows()]).strip()
-
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
-        for filename, columns in subtitle_output_configs:
-            subtitle_str = generate_subtitle_string(df_trans_time, columns)
-            with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
-                f.write(subtitle_str)
+    if output_dir or table_path:
+        subtitle_table = build_subtitle_table(
+            df_trans_time['Source'], df_trans_time['Translation'],
+            [t[0] for t in numeric_timestamps], [t[1] for t in numeric_timestamps],
+            aligner.speakers_for(word_spans),
+        )
+        if table_path:
+            write_subtitle_table(subtitle_table, table_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            for filename, columns in subtitle_output_configs:
+                with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+                    f.write(render_srt(subtitle_table, columns))
     
     return df_trans_time
 
@@ -163,19 +231,19 @@ def clean_translation(x):
     return autocorrect.format(cleaned)
 
 def align_timestamp_main():
-    df_text = pd.read_excel(_2_CLEANED_CHUNKS)
+    df_text = read_table(_2_CLEANED_CHUNKS)
     df_text['text'] = df_text['text'].str.strip('"').str.strip()
-    df_translate = pd.read_excel(_5_SPLIT_SUB)
+    df_translate = read_table(_5_SPLIT_SUB)
     df_translate['Translation'] = df_translate['Translation'].apply(clean_translation)
     
-    align_timestamp(df_text, df_translate, SUBTITLE_OUTPUT_CONFIGS, _OUTPUT_DIR)
+    align_timestamp(df_text, df_translate, SUBTITLE_OUTPUT_CONFIGS, _OUTPUT_DIR, table_path=_6_SUBTITLES)
     console.print(Panel("[bold green]🎉📝 Subtitles generation completed! Please check in the `output` folder 👀[/bold green]"))
 
     # for audio
-    df_translate_for_audio = pd.read_excel(_5_REMERGED) # use remerged file to avoid unmatched lines when dubbing
+    df_translate_for_audio = read_table(_5_REMERGED) # use remerged file to avoid unmatched lines when dubbing
     df_translate_for_audio['Translation'] = df_translate_for_audio['Translation'].apply(clean_translation)
     
-    align_timestamp(df_text, df_translate_for_audio, AUDIO_SUBTITLE_OUTPUT_CONFIGS, _AUDIO_DIR)
+    align_timestamp(df_text, df_translate_for_audio, AUDIO_SUBTITLE_OUTPUT_CONFIGS, _AUDIO_DIR, table_path=_6_AUDIO_SUBTITLES)
     console.print(Panel(f"[bold green]🎉📝 Audio subtitles generation completed! Please check in the `{_AUDIO_DIR}` folder 👀[/bold green]"))
     
 
@@ -1,130 +1,172 @@
-import datetime
+import concurrent.futures
 import re
 import pandas as pd
 from rich.console import Console
 from rich.panel import Panel
-from core.prompts import get_subtitle_trim_prompt
+from core.prompts import get_subtitle_trim_prompt, get_subtitle_trim_batch_prompt
 from core.tts_backend.estimate_duration import init_estimator, estimate_duration
 from core.utils import *
 from core.utils.models import *
+from core.utils.table_io import write_table
+from core.utils.subtitle_table import read_subtitle_table, ms_to_srt_time
 
 console = Console()
 speed_factor = load_key("speed_factor")
 
-TRANS_SUBS_FOR_AUDIO_FILE = 'output/audio/trans_subs_for_audio.srt'
-SRC_SUBS_FOR_AUDIO_FILE = 'output/audio/src_subs_for_audio.srt'
 ESTIMATOR = None
 
-def check_len_then_trim(text, duration):
+# Over-long lines sent to the LLM together in one trim prompt
+TRIM_BATCH_SIZE = 5
+
+def _estimate_reading_duration(text):
     global ESTIMATOR
     if ESTIMATOR is None:
         ESTIMATOR = init_estimator()
-    estimated_duration = estimate_duration(text, ESTIMATOR) / speed_factor['max']
+    return estimate_duration(text, ESTIMATOR) / speed_factor['max']
+
+def _remove_punctuation_trim(text):
+    return re.sub(r'[,.!?;:，。！？；：]', ' ', text).strip()
+
+def trim_text(text, duration):
+    """Shorten one subtitle with the LLM, dropping punctuation instead if it refuses"""
+    prompt = get_subtitle_trim_prompt(text, duration)
+    def valid_trim(response):
+        if 'result' not in response:
+            return {'status': 'error', 'message': 'No result in response'}
+        return {'status': 'success', 'message': ''}
+    try:    
+        response = ask_gpt(prompt, resp_type='json', log_title='sub_trim', valid_def=valid_trim)
+        shortened_text = response['result']
+    except Exception:
+        rprint("[bold red]🚫 AI refused to answer due to sensitivity, so manually remove punctuation[/bold red]")
+        shortened_text = _remove_punctuation_trim(text)
+    rprint(Panel(f"Subtitle before shortening: {text}\nSubtitle after shortening: {shortened_text}", title="Subtitle Shortening Result", border_style="green"))
+    return shortened_text
+
+def trim_texts(items):
+    """Shorten several (text, duration) subtitles with one prompt, per-line prompts if the batch fails"""
+    if len(items) == 1:
+        return [trim_text(*items[0])]
+    prompt = get_subtitle_trim_batch_prompt(items)
+    def valid_trim(response):
+        results = response.get('results')
+        if not isinstance(results, dict):
+            return {'status': 'error', 'message': 'No results in response'}
+        missing = [str(i + 1) for i in range(len(items)) if not str(results.get(str(i + 1), '')).strip()]
+        if missing:
+            return {'status': 'error', 'message': f'Missing results: {", ".join(missing)}'}
+        return {'status': 'success', 'message': ''}
+    try:
+        response = ask_gpt(prompt, resp_type='json', log_title='sub_trim', valid_def=valid_trim)
+    except Exception:
+        rprint("[yellow]⚠️ Batch trim failed, trimming these subtitles one by one[/yellow]")
+        return [trim_text(text, duration) for text, duration in items]
+    shortened = [str(response['results'][str(i + 1)]).strip() for i in range(len(items))]
+    rprint(Panel("\n".join(f"{text}\n→ {short}" for (text, _), short in zip(items, shortened)), title="Subtitle Shortening Result", border_style="green"))
+    return shortened
+
+def check_len_then_trim(text, duration):
+    estimated_duration = _estimate_reading_duration(text)
     
     console.print(f"Subtitle text: {text}, "
                   f"[bold green]Estimated reading duration: {estimated_duration:.2f} seconds[/bold green]")
 
     if estimated_duration > duration:
         rprint(Panel(f"Estimated reading duration {estimated_duration:.2f} seconds exceeds given duration {duration:.2f} seconds, shortening...", title="Processing", border_style="yellow"))
-        original_text = text
-        prompt = get_subtitle_trim_prompt(text, duration)
-        def valid_trim(response):
-            if 'result' not in response:
-                return {'status': 'error', 'message': 'No result in response'}
-            return {'status': 'success', 'message': ''}
-        try:    
-            response = ask_gpt(prompt, resp_type='json', log_title='sub_trim', valid_def=valid_trim)
-            shortened_text = response['result']
-        except Exception:
-            rprint("[bold red]🚫 AI refused to answer due to sensitivity, so manually remove punctuation[/bold red]")
-            shortened_text = re.sub(r'[,.!?;:，。！？；：]', ' ', text).strip()
-        rprint(Panel(f"Subtitle before shortening: {original_text}\nSubtitle after shortening: {shortened_text}", title="Subtitle Shortening Result", border_style="green"))
-        return shortened_text
+        return trim_text(text, duration)
     else:
         return text
 
-def time_diff_seconds(t1, t2, base_date):
-    """Calculate the difference in seconds between two time objects"""
-    dt1 = datetime.datetime.combine(base_date, t1)
-    dt2 = datetime.datetime.combine(base_date, t2)
-    return (dt2 - dt1).total_seconds()
+def trim_over_long_texts(texts, durations, min_duration=0):
+    """
+    check_len_then_trim for a whole column: every line whose estimated reading time exceeds its duration
+    (only for durations above `min_duration`) is trimmed in batches on the shared LLM pool.
+    """
+    texts = list(texts)
+    over_long = []
+    for i, (text, duration) in enumerate(zip(texts, durations)):
+        if duration <= min_duration:
+            continue
+        estimated_duration = _estimate_reading_duration(text)
+        if estimated_duration > duration:
+            over_long.append(i)
+            console.print(f"[yellow]Subtitle {i} needs trimming: estimated {estimated_duration:.2f}s > {duration:.2f}s: {text}[/yellow]")
+    if not over_long:
+        return texts
+
+    batches = [over_long[i:i + TRIM_BATCH_SIZE] for i in range(0, len(over_long), TRIM_BATCH_SIZE)]
+    rprint(f"[cyan]✂️ Trimming {len(over_long)} over-long subtitles in {len(batches)} batches...[/cyan]")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=get_llm_concurrency()) as executor:
+        futures = {
+            executor.submit(trim_texts, [(texts[i], durations[i]) for i in batch]): batch
+            for batch in batches
+        }
+        for future in concurrent.futures.as_completed(futures):
+            for i, shortened in zip(futures[future], future.result()):
+                texts[i] = shortened
+    return texts
+
+def _clean_dub_text(text):
+    # Remove content within parentheses (including English and Chinese parentheses)
+    text = re.sub(r'\([^)]*\)', '', text).strip()
+    text = re.sub(r'（[^）]*）', '', text).strip()
+    # Remove '-' character, can continue to add illegal characters that cause errors
+    return text.replace('-', '')
+
+def merge_short_subtitles(rows, min_sub_dur):
+    """Merge each subtitle shorter than `min_sub_dur` with the following ones that start within it,
+    or extend it to `min_sub_dur` when nothing does; one forward pass over the rows"""
+    min_sub_ms = round(min_sub_dur * 1000)
+    merged = []
+    if not rows:
+        return merged
+    merge_count = extend_count = 0
+    current = dict(rows[0])
+    for row in rows[1:]:
+        if current['duration'] < min_sub_dur:
+            if row['start_ms'] - current['start_ms'] < min_sub_ms:
+                current['text'] += ' ' + row['text']
+                current['origin'] += ' ' + row['origin']
+                current['end_ms'] = row['end_ms']
+                current['duration'] = (current['end_ms'] - current['start_ms']) / 1000
+                merge_count += 1
+                continue
+            current['end_ms'] = current['start_ms'] + min_sub_ms
+            current['duration'] = min_sub_dur
+            extend_count += 1
+        merged.append(current)
+        current = dict(row)
+    merged.append(current)
+
+    if merge_count:
+        rprint(f"[bold yellow]Merged {merge_count} short subtitles into the ones before them[/bold yellow]")
+    if extend_count:
+        rprint(f"[bold blue]Extended {extend_count} subtitles to {min_sub_dur} seconds[/bold blue]")
+    if current['duration'] < min_sub_dur:
+        rprint(f"[bold red]The last subtitle {len(merged)} duration is less than {min_sub_dur} seconds, but not extending[/bold red]")
+    return merged
 
 def process_srt():
-    """Process srt file, generate audio tasks"""
-    
-    with open(TRANS_SUBS_FOR_AUDIO_FILE, 'r', encoding='utf-8') as file:
-        content = file.read()
-    
-    with open(SRC_SUBS_FOR_AUDIO_FILE, 'r', encoding='utf-8') as src_file:
-        src_content = src_file.read()
-    
-    subtitles = []
-    src_subtitles = {}
-    
-    for block in src_content.strip().split('\n\n'):
-        lines = [line.strip() for line in block.split('\n') if line.strip()]
-        if len(lines) < 3:
-            continue
-        
-        number = int(lines[0])
-        src_text = ' '.join(lines[2:])
-        src_subtitles[number] = src_text
-    
-    for block in content.strip().split('\n\n'):
-        lines = [line.strip() for line in block.split('\n') if line.strip()]
-        if len(lines) < 3:
-            continue
-        
-        try:
-            number = int(lines[0])
-            start_time, end_time = lines[1].split(' --> ')
-            start_time = datetime.datetime.strptime(start_time, '%H:%M:%S,%f').time()
-            end_time = datetime.datetime.strptime(end_time, '%H:%M:%S,%f').time()
-            duration = time_diff_seconds(start_time, end_time, datetime.date.today())
-            text = ' '.join(lines[2:])
-            # Remove content within parentheses (including English and Chinese parentheses)
-            text = re.sub(r'\([^)]*\)', '', text).strip()
-            text = re.sub(r'（[^）]*）', '', text).strip()
-            # Remove '-' character, can continue to add illegal characters that cause errors
-            text = text.replace('-', '')
-
-            # Add the original text from src_subs_for_audio.srt
-            origin = src_subtitles.get(number, '')
-
-        except ValueError as e:
-            rprint(Panel(f"Unable to parse subtitle block '{block}', error: {str(e)}, skipping this subtitle block.", title="Error", border_style="red"))
-            continue
-        
-        subtitles.append({'number': number, 'start_time': start_time, 'end_time': end_time, 'duration': duration, 'text': text, 'origin': origin})
-    
-    df = pd.DataFrame(subtitles)
+    """Generate audio tasks from the audio subtitle table"""
+    subs = read_subtitle_table(_6_AUDIO_SUBTITLES)
+    # lines without a translation have nothing to dub
+    subs = subs[subs['Translation'].str.strip() != ''].reset_index(drop=True)
+    tasks = pd.DataFrame({
+        'number': subs['number'].astype(int),
+        'start_ms': subs['start_ms'],
+        'end_ms': subs['end_ms'],
+        'duration': (subs['end_ms'] - subs['start_ms']) / 1000,
+        'text': subs['Translation'].map(_clean_dub_text),
+        'origin': subs['Source'].str.strip(),
+        'speaker': subs['speaker'],
+    })
     
-    i = 0
-    MIN_SUB_DUR = load_key("min_subtitle_duration")
-    while i < len(df):
-        today = datetime.date.today()
-        if df.loc[i, 'duration'] < MIN_SUB_DUR:
-            if i < len(df) - 1 and time_diff_seconds(df.loc[i, 'start_time'],df.loc[i+1, 'start_time'],today) < MIN_SUB_DUR:
-                rprint(f"[bold yellow]Merging subtitles {i+1} and {i+2}[/bold yellow]")
-                df.loc[i, 'text'] += ' ' + df.loc[i+1, 'text']
-                df.loc[i, 'origin'] += ' ' + df.loc[i+1, 'origin']
-                df.loc[i, 'end_time'] = df.loc[i+1, 'end_time']
-                df.loc[i, 'duration'] = time_diff_seconds(df.loc[i, 'start_time'],df.loc[i, 'end_time'],today)
-                df = df.drop(i+1).reset_index(drop=True)
-            else:
-                if i < len(df) - 1:  # Not the last audio
-                    rprint(f"[bold blue]Extending subtitle {i+1} duration to {MIN_SUB_DUR} seconds[/bold blue]")
-                    df.loc[i, 'end_time'] = (datetime.datetime.combine(today, df.loc[i, 'start_time']) + 
-                                            datetime.timedelta(seconds=MIN_SUB_DUR)).time()
-                    df.loc[i, 'duration'] = MIN_SUB_DUR
-                else:
-                    rprint(f"[bold red]The last subtitle {i+1} duration is less than {MIN_SUB_DUR} seconds, but not extending[/bold red]")
-                i += 1
-        else:
-            i += 1
+    rows = merge_short_subtitles(tasks.to_dict('records'), load_key("min_subtitle_duration"))
+    df = pd.DataFrame(rows, columns=tasks.columns)
     
-    df['start_time'] = df['start_time'].apply(lambda x: x.strftime('%H:%M:%S.%f')[:-3])
-    df['end_time'] = df['end_time'].apply(lambda x: x.strftime('%H:%M:%S.%f')[:-3])
+    # readable times kept next to the integer ones for the task table and the editor
+    df.insert(1, 'start_time', [ms_to_srt_time(ms, '.') for ms in df['start_ms']])
+    df.insert(2, 'end_time', [ms_to_srt_time(ms, '.') for ms in df['end_ms']])
 
     ##! No longer perform secondary trim
     # check and trim subtitle length, for twice to ensure the subtitle length is within the limit, 允许tolerance
@@ -136,7 +178,7 @@ def process_srt():
 def gen_audio_task_main():
     df = process_srt()
     console.print(df)
-    df.to_excel(_8_1_AUDIO_TASK, index=False)
+    write_table(df, _8_1_AUDIO_TASK)
     rprint(Panel(f"Successfully generated {_8_1_AUDIO_TASK}", title="Success", border_style="green"))
 
 if __name__ == '__main__':
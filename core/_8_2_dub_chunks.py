@@ -1,14 +1,12 @@
-import datetime
 import re
 import pandas as pd
-from core._8_1_audio_task import time_diff_seconds
 from core.asr_backend.audio_preprocess import get_audio_duration
 from core.tts_backend.estimate_duration import init_estimator, estimate_duration
 from core.utils import *
 from core.utils.models import *
+from core.utils.table_io import read_table, write_table
+from core.utils.subtitle_table import read_subtitle_table
 
-SRC_SRT = "output/src.srt"
-TRANS_SRT = "output/trans.srt"
 MAX_MERGE_COUNT = 5
 ESTIMATOR = None
 
@@ -62,17 +60,10 @@ def analyze_subtitle_timing_and_speed(df):
         ESTIMATOR = init_estimator()
     TOLERANCE = load_key("tolerance")
     whole_dur = get_audio_duration(_RAW_AUDIO_FILE)
-    df['gap'] = 0.0  # Initialize gap column
-    for i in range(len(df) - 1):
-        current_end = datetime.datetime.strptime(df.loc[i, 'end_time'], '%H:%M:%S.%f').time()
-        next_start = datetime.datetime.strptime(df.loc[i + 1, 'start_time'], '%H:%M:%S.%f').time()
-        df.loc[i, 'gap'] = time_diff_seconds(current_end, next_start, datetime.date.today())
-    
-    # Set the gap for the last line
-    last_end = datetime.datetime.strptime(df.iloc[-1]['end_time'], '%H:%M:%S.%f').time()
-    last_end_seconds = (last_end.hour * 3600 + last_end.minute * 60 + 
-                       last_end.second + last_end.microsecond / 1000000)
-    df.iloc[-1, df.columns.get_loc('gap')] = whole_dur - last_end_seconds
+    # gap to the next line, and to the end of the audio for the last line
+    next_start_ms = df['start_ms'].shift(-1)
+    df['gap'] = ((next_start_ms - df['end_ms']) / 1000).astype(float)
+    df.iloc[-1, df.columns.get_loc('gap')] = whole_dur - df.iloc[-1]['end_ms'] / 1000
     
     df['tolerance'] = df['gap'].apply(lambda x: TOLERANCE if x > TOLERANCE else x)
     df['tol_dur'] = df['duration'] + df['tolerance']
@@ -131,7 +122,7 @@ def process_cutoffs(df):
 
 def gen_dub_chunks():
     rprint("[🎬 Starting] Generating dubbing chunks...")
-    df = pd.read_excel(_8_1_AUDIO_TASK)
+    df = read_table(_8_1_AUDIO_TASK)
     
     rprint("[📊 Processing] Analyzing timing and speed...")
     df = analyze_subtitle_timing_and_speed(df)
@@ -139,29 +130,15 @@ def gen_dub_chunks():
     rprint("[✂️ Processing] Processing cutoffs...")
     df = process_cutoffs(df)
 
-    rprint("[📝 Reading] Loading transcript files...")
-    content = open(TRANS_SRT, "r", encoding="utf-8").read()
-    ori_content = open(SRC_SRT, "r", encoding="utf-8").read()
-    
-    # Process subtitle content
-    content_lines = []
-    ori_content_lines = []
+    rprint("[📝 Reading] Loading subtitle table...")
+    subs = read_subtitle_table(_6_SUBTITLES)
+    subs = subs[subs['Translation'].str.strip() != ''].reset_index(drop=True)
     
-    # Process translated subtitles
-    for block in content.strip().split('\n\n'):
-        lines = [line.strip() for line in block.split('\n') if line.strip()]
-        if len(lines) >= 3:
-            text = ' '.join(lines[2:])
-            text = re.sub(r'\([^)]*\)|（[^）]*）', '', text).strip().replace('-', '')
-            content_lines.append(text)
-            
-    # Process source subtitles (same structure)
-    for block in ori_content.strip().split('\n\n'):
-        lines = [line.strip() for line in block.split('\n') if line.strip()]
-        if len(lines) >= 3:
-            text = ' '.join(lines[2:])
-            text = re.sub(r'\([^)]*\)|（[^）]*）', '', text).strip().replace('-', '')
-            ori_content_lines.append(text)
+    def clean_line(text):
+        return re.sub(r'\([^)]*\)|（[^）]*）', '', text).strip().replace('-', '')
+
+    content_lines = subs['Translation'].map(clean_line).tolist()
+    ori_content_lines = subs['Source'].map(clean_line).tolist()
 
     # Match processing
     df['lines'] = None
@@ -199,7 +176,7 @@ def gen_dub_chunks():
             raise ValueError("Matching failed")
 
     # Save results
-    df.to_excel(_8_1_AUDIO_TASK, index=False)
+    write_table(df, _8_1_AUDIO_TASK)
     rprint("[✅ Complete] Matching completed successfully!")
 
 if __name__ == "__main__":
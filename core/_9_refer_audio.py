@@ -4,24 +4,20 @@ from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from core.utils import *
 from core.utils.models import *
+from core.utils.table_io import read_table
 import pandas as pd
 import soundfile as sf
 console = Console()
 from core.asr_backend.demucs_vl import demucs_audio
 from core.utils.models import *
 
-def time_to_samples(time_str, sr):
-    """Unified time conversion function"""
-    h, m, s = time_str.split(':')
-    s, ms = s.split(',') if ',' in s else (s, '0')
-    seconds = int(h) * 3600 + int(m) * 60 + float(s) + float(ms) / 1000
-    return int(seconds * sr)
-
-def extract_audio(audio_data, sr, start_time, end_time, out_file):
-    """Simplified audio extraction function"""
-    start = time_to_samples(start_time, sr)
-    end = time_to_samples(end_time, sr)
-    sf.write(out_file, audio_data[start:end], sr)
+def extract_audio(audio_file, start_ms, end_ms, out_file):
+    """Simplified audio extraction function, reads only the clip from the open sf.SoundFile"""
+    sr = audio_file.samplerate
+    start = int(start_ms * sr / 1000)
+    end = int(end_ms * sr / 1000)
+    audio_file.seek(min(start, audio_file.frames))
+    sf.write(out_file, audio_file.read(max(0, end - start)), sr)
 
 def extract_refer_audio_main():
     demucs_audio() #!!! in case demucs not run
@@ -33,10 +29,10 @@ def extract_refer_audio_main():
     os.makedirs(_AUDIO_REFERS_DIR, exist_ok=True)
     
     # Read task file and audio data
-    df = pd.read_excel(_8_1_AUDIO_TASK)
-    data, sr = sf.read(_VOCAL_AUDIO_FILE)
+    df = read_table(_8_1_AUDIO_TASK)
     
-    with Progress(
+    # clips are read straight from the vocal track at its own rate and channels, for voice cloning quality
+    with sf.SoundFile(_VOCAL_AUDIO_FILE) as audio_file, Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
@@ -46,7 +42,7 @@ def extract_refer_audio_main():
         
         for _, row in df.iterrows():
             out_file = os.path.join(_AUDIO_REFERS_DIR, f"{row['number']}.wav")
-            extract_audio(data, sr, row['start_time'], row['end_time'], out_file)
+            extract_audio(audio_file, row['start_ms'], row['end_ms'], out_file)
             progress.update(task, advance=1)
             
     rprint(Panel(f"Audio segments saved to {_AUDIO_REFERS_DIR}", title="Success", border_style="green"))
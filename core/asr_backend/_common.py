@@ -8,9 +8,11 @@ import time
 import subprocess
 import torch
 import whisperx
-from pydub import AudioSegment
 from rich import print as rprint
 from core.utils import load_key, update_key, except_handler
+from core.asr_backend.model_registry import get_align_model, get_diarization_pipeline
+from core.asr_backend.audio_cache import get_dbfs, load_pcm_window
+from core.asr_backend.speaker_overlap import assign_best_speakers
 
 MODEL_DIR = load_key("model_dir")
 
@@ -29,8 +31,7 @@ def get_language_prompt(language: str) -> str:
 def select_vad_parameters(audio_path: str) -> dict:
     """Select VAD parameters based on RMS loudness (dBFS)."""
     try:
-        audio = AudioSegment.from_file(audio_path)
-        rms_dbfs = audio.dBFS
+        rms_dbfs = get_dbfs(audio_path)
     except Exception as exc:
         rprint(f"[yellow]⚠️ Failed to read audio RMS: {exc}, using default VAD[/yellow]")
         rms_dbfs = None
@@ -126,11 +127,8 @@ def find_whisper_model_path(language: str = None):
 # ============================================================================
 
 def load_audio_segment(audio_file: str, start: float, end: float):
-    """Load audio segment from file."""
-    full_audio = whisperx.load_audio(audio_file)
-    start_sample = int(start * 16000)
-    end_sample = min(int(end * 16000), len(full_audio))
-    return full_audio[start_sample:end_sample]
+    """Load audio segment from the shared decoded PCM cache."""
+    return load_pcm_window(audio_file, start, end)
 
 
 # ============================================================================
@@ -140,29 +138,13 @@ def load_audio_segment(audio_file: str, start: float, end: float):
 def align_transcription(result: dict, audio_segment, device: str, language: str):
     """Align transcription with WhisperX for word-level timestamps."""
     align_start_time = time.time()
-    model_cache_dir = os.path.abspath(MODEL_DIR)
-    
-    try:
-        os.environ["HF_HUB_OFFLINE"] = "1"
-        model_a, metadata = whisperx.load_align_model(
-            language_code=language, device=device, model_dir=model_cache_dir
-        )
-        rprint("[green]✓ Alignment model loaded[/green]")
-    except Exception:
-        os.environ.pop("HF_HUB_OFFLINE", None)
-        model_a, metadata = whisperx.load_align_model(
-            language_code=language, device=device, model_dir=model_cache_dir
-        )
-    finally:
-        os.environ.pop("HF_HUB_OFFLINE", None)
+    model_a, metadata = get_align_model(language, device)
     
     aligned_result = whisperx.align(
         result["segments"], model_a, metadata, audio_segment, device,
         return_char_alignments=False,
     )
     
-    del model_a
-    torch.cuda.empty_cache()
     rprint(f"[cyan]⏱️ Alignment:[/cyan] {time.time() - align_start_time:.2f}s")
     
     return aligned_result
@@ -190,13 +172,9 @@ def run_speaker_diarization(result: dict, audio_segment, device: str):
         if hf_mirror:
             os.environ["HF_ENDPOINT"] = hf_mirror
         
-        from pyannote.audio import Pipeline
         import pandas as pd
         
-        diarize_model = Pipeline.from_pretrained(
-            "pyannote/speaker-diarization-3.1", token=hf_token
-        )
-        diarize_model = diarize_model.to(torch.device(device))
+        diarize_model = get_diarization_pipeline(hf_token, device)
         
         waveform = torch.from_numpy(audio_segment).unsqueeze(0)
         audio_dict = {"waveform": waveform, "sample_rate": 16000}
@@ -225,22 +203,18 @@ def run_speaker_diarization(result: dict, audio_segment, device: str):
         result = whisperx.assign_word_speakers(diarize_df, result)
 
         # Fill missing segment-level speakers if assign_word_speakers didn't label all segments
-        for segment in result.get("segments", []):
-            if segment.get("speaker"):
-                continue
-            seg_start = segment.get("start")
-            seg_end = segment.get("end")
-            if seg_start is None or seg_end is None:
-                continue
-            overlaps = {}
-            for _, row in diarize_df.iterrows():
-                overlap_start = max(seg_start, row["start"])
-                overlap_end = min(seg_end, row["end"])
-                overlap = max(0.0, overlap_end - overlap_start)
-                if overlap > 0:
-                    overlaps[row["speaker"]] = overlaps.get(row["speaker"], 0.0) + overlap
-            if overlaps:
-                segment["speaker"] = max(overlaps.items(), key=lambda item: item[1])[0]
+        unlabeled = [
+            segment for segment in result.get("segments", [])
+            if not segment.get("speaker") and segment.get("start") is not None and segment.get("end") is not None
+        ]
+        if unlabeled:
+            best_speakers = assign_best_speakers(
+                diarize_df["start"].to_numpy(), diarize_df["end"].to_numpy(), diarize_df["speaker"].to_numpy(),
+                [segment["start"] for segment in unlabeled], [segment["end"] for segment in unlabeled],
+            )
+            for segment, speaker in zip(unlabeled, best_speakers):
+                if speaker is not None:
+                    segment["speaker"] = speaker
         
         if load_key("diarization.auto_generate_samples"):
             samples_dir = load_key("diarization.samples_dir") or "speaker_samples"
@@ -276,9 +250,6 @@ def run_speaker_diarization(result: dict, audio_segment, device: str):
             except Exception as e:
                 rprint(f"[yellow]⚠️ Speaker identification failed: {e}[/yellow]")
         
-        del diarize_model
-        torch.cuda.empty_cache()
-        
     except Exception as e:
         import traceback
         rprint(f"[yellow]⚠️ Speaker diarization failed: {e}[/yellow]")
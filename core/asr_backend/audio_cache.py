@@ -0,0 +1,121 @@
+"""
+Decoded audio cache shared by every audio consumer.
+Each source file is decoded once with ffmpeg into a mono float32 PCM file and memory-mapped,
+keyed by path, mtime and size; callers slice windows out of the mapping instead of re-decoding the mp3.
+"""
+import glob
+import hashlib
+import math
+import os
+import subprocess
+import threading
+import numpy as np
+from rich import print as rprint
+from core.utils.models import _PCM_CACHE_DIR
+
+SAMPLE_RATE = 16000
+_lock = threading.Lock()
+_arrays = {}  # cache key -> np.memmap
+_dbfs = {}  # cache key -> float
+
+
+def _cache_key(audio_file: str, sample_rate: int):
+    path = os.path.abspath(audio_file)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size, sample_rate
+
+
+def _cache_path(key) -> str:
+    path, mtime_ns, size, sample_rate = key
+    path_hash = hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_PCM_CACHE_DIR, f"{path_hash}_{sample_rate}_{mtime_ns}_{size}.f32")
+
+
+def _ffmpeg_f32_cmd(audio_file: str, sample_rate: int, output: str):
+    return [
+        "ffmpeg", "-nostdin", "-v", "error", "-y", "-i", audio_file,
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(sample_rate),
+        output,
+    ]
+
+
+def _decode_to_file(audio_file: str, sample_rate: int, out_path: str):
+    """Decode with ffmpeg straight to raw float32 mono, then publish atomically."""
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    subprocess.run(_ffmpeg_f32_cmd(audio_file, sample_rate, tmp_path), check=True, stderr=subprocess.PIPE)
+    try:
+        os.replace(tmp_path, out_path)
+    except OSError:
+        # another process published the same file first (and may have it mapped)
+        os.remove(tmp_path)
+
+
+def _remove_stale(key, keep_path: str):
+    path_hash = os.path.basename(keep_path).split("_")[0]
+    for stale in glob.glob(os.path.join(_PCM_CACHE_DIR, f"{path_hash}_{key[3]}_*.f32")):
+        if os.path.abspath(stale) == os.path.abspath(keep_path):
+            continue
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+def decode_pcm(audio_file: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mono float32 PCM of a short one-off file, decoded in memory without touching the cache."""
+    result = subprocess.run(_ffmpeg_f32_cmd(audio_file, sample_rate, "pipe:1"), check=True, capture_output=True)
+    return np.frombuffer(result.stdout, dtype=np.float32).copy()
+
+
+def load_pcm(audio_file: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Read-only memory-mapped mono float32 PCM of the whole file."""
+    key = _cache_key(audio_file, sample_rate)
+    with _lock:
+        audio = _arrays.get(key)
+        if audio is not None:
+            return audio
+
+        os.makedirs(_PCM_CACHE_DIR, exist_ok=True)
+        cache_path = _cache_path(key)
+        if not os.path.exists(cache_path):
+            rprint(f"[cyan]🎵 Decoding {audio_file} to PCM cache ({sample_rate} Hz)...[/cyan]")
+            _decode_to_file(audio_file, sample_rate, cache_path)
+            _remove_stale(key, cache_path)
+
+        if os.path.getsize(cache_path) == 0:
+            audio = np.zeros(0, dtype=np.float32)
+        else:
+            audio = np.memmap(cache_path, dtype=np.float32, mode="r")
+        # drop arrays of older versions of the same file
+        for old_key in [k for k in _arrays if k[0] == key[0] and k[3] == sample_rate]:
+            _arrays.pop(old_key, None)
+            _dbfs.pop(old_key, None)
+        _arrays[key] = audio
+        return audio
+
+
+def load_pcm_window(audio_file: str, start: float, end: float, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """[start, end) seconds as a writable float32 array (only the window is copied)."""
+    audio = load_pcm(audio_file, sample_rate)
+    start_sample = max(0, int(start * sample_rate))
+    end_sample = min(int(end * sample_rate), len(audio))
+    return np.array(audio[start_sample:end_sample], dtype=np.float32)
+
+
+def get_dbfs(audio_file: str, block_size: int = SAMPLE_RATE * 60) -> float:
+    """RMS loudness of the whole file in dBFS, -inf for silence."""
+    key = _cache_key(audio_file, SAMPLE_RATE)
+    if key in _dbfs:
+        return _dbfs[key]
+    audio = load_pcm(audio_file)
+    if len(audio) == 0:
+        return float("-inf")
+    # accumulate in blocks so the mapped file is never copied whole
+    square_sum = 0.0
+    for i in range(0, len(audio), block_size):
+        block = np.asarray(audio[i:i + block_size], dtype=np.float64)
+        square_sum += float(np.dot(block, block))
+    rms = math.sqrt(square_sum / len(audio))
+    dbfs = 20 * math.log10(rms) if rms > 0 else float("-inf")
+    _dbfs[key] = dbfs
+    return dbfs
@@ -1,9 +1,12 @@
 import os, subprocess
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
+from collections import Counter
 from pydub import AudioSegment
 from core.utils import *
 from core.utils.models import *
+from core.utils.table_io import write_table
 from pydub import AudioSegment
 from pydub.silence import detect_silence
 from pydub.utils import mediainfo
@@ -194,72 +197,43 @@ def smooth_speaker_ids(
     # Backward fill any remaining None at the beginning
     df["speaker_id"] = df["speaker_id"].bfill()
 
-    # Step 2: Identify speaker segments (consecutive words with same speaker)
-    df["speaker_change"] = (df["speaker_id"] != df["speaker_id"].shift()).cumsum()
+    speakers = df["speaker_id"].to_numpy(dtype=object)
+    starts = df["start"].to_numpy(dtype=float)
+    ends = df["end"].to_numpy(dtype=float)
 
-    # Step 3: Fix short speaker segments (likely errors)
-    segment_stats = (
-        df.groupby("speaker_change")
-        .agg({"start": "min", "end": "max", "speaker_id": "first"})
-        .reset_index()
-    )
-    segment_stats["duration"] = segment_stats["end"] - segment_stats["start"]
-
-    # Find short segments that should be merged
-    short_segments = segment_stats[segment_stats["duration"] < min_segment_duration][
-        "speaker_change"
-    ].tolist()
-
-    for seg_id in short_segments:
-        # Get previous and next segment speakers
-        seg_idx = segment_stats[segment_stats["speaker_change"] == seg_id].index[0]
-
-        prev_speaker = None
-        next_speaker = None
-
-        if seg_idx > 0:
-            prev_speaker = segment_stats.iloc[seg_idx - 1]["speaker_id"]
-        if seg_idx < len(segment_stats) - 1:
-            next_speaker = segment_stats.iloc[seg_idx + 1]["speaker_id"]
-
-        # Decide which speaker to assign
-        if prev_speaker == next_speaker and prev_speaker is not None:
-            # Surrounded by same speaker - definitely an error
-            new_speaker = prev_speaker
-        elif prev_speaker is not None:
-            # Default to previous speaker (more natural in conversation)
-            new_speaker = prev_speaker
-        elif next_speaker is not None:
-            new_speaker = next_speaker
-        else:
-            continue  # Can't determine, skip
+    # Step 2: Run-length encode speaker segments (consecutive words with same speaker)
+    codes, _ = pd.factorize(df["speaker_id"])
+    run_starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    run_lengths = np.diff(np.r_[run_starts, len(codes)])
+    run_speakers = speakers[run_starts]
 
-        # Update speaker_id for this segment
-        df.loc[df["speaker_change"] == seg_id, "speaker_id"] = new_speaker
+    # Step 3: Fix short speaker segments (likely errors)
+    run_durations = np.maximum.reduceat(ends, run_starts) - np.minimum.reduceat(starts, run_starts)
+    short = run_durations < min_segment_duration
+    new_run_speakers = run_speakers.copy()
+    # Default to previous speaker (more natural in conversation), the first run takes the next one
+    has_prev = short.copy()
+    has_prev[0] = False
+    new_run_speakers[has_prev] = run_speakers[np.flatnonzero(has_prev) - 1]
+    if short[0] and len(run_speakers) > 1:
+        new_run_speakers[0] = run_speakers[1]
+    speakers = np.repeat(new_run_speakers, run_lengths)
 
     # Step 4: Fix rapid switches (words very close together but different speakers)
-    df["gap_to_prev"] = df["start"] - df["end"].shift()
-    df["gap_to_prev"] = df["gap_to_prev"].fillna(0)
-
-    for i in range(1, len(df)):
-        if df.iloc[i]["gap_to_prev"] < gap_threshold:
-            # Check if this is an isolated speaker switch
-            prev_speaker = df.iloc[i - 1]["speaker_id"]
-            curr_speaker = df.iloc[i]["speaker_id"]
-
-            if prev_speaker != curr_speaker:
-                # Look ahead to see if this is a real switch or just noise
-                lookahead = min(i + 5, len(df))
-                future_speakers = df.iloc[i:lookahead]["speaker_id"].tolist()
-
-                # If most future words return to prev_speaker, this is likely noise
-                if future_speakers.count(prev_speaker) > future_speakers.count(
-                    curr_speaker
-                ):
-                    df.iloc[i, df.columns.get_loc("speaker_id")] = prev_speaker
-
-    # Clean up temporary columns
-    df = df.drop(columns=["speaker_change", "gap_to_prev"], errors="ignore")
+    gaps = starts[1:] - ends[:-1]
+    gaps = np.where(np.isnan(gaps), 0, gaps)
+    speakers = speakers.tolist()
+    for i in (np.flatnonzero(gaps < gap_threshold) + 1).tolist():
+        # Check if this is an isolated speaker switch
+        prev_speaker = speakers[i - 1]
+        curr_speaker = speakers[i]
+        if prev_speaker != curr_speaker:
+            # Look ahead: if most future words return to prev_speaker, this is likely noise
+            future_speakers = speakers[i:i + 5]
+            if future_speakers.count(prev_speaker) > future_speakers.count(curr_speaker):
+                speakers[i] = prev_speaker
+
+    df["speaker_id"] = speakers
 
     rprint(f"[cyan]Speaker ID smoothing complete[/cyan]")
     return df
@@ -407,21 +381,11 @@ def process_transcription_word_mode(result: Dict) -> pd.DataFrame:
         segment_words = segment.get("words", [])
         word_speakers = [w.get("speaker", segment_speaker) for w in segment_words]
 
-        # Count speaker occurrences (excluding None)
-        speaker_counts = {}
-        for sp in word_speakers:
-            if sp is not None:
-                speaker_counts[sp] = speaker_counts.get(sp, 0) + 1
-
-        # Determine segment's dominant speaker (majority vote)
-        if speaker_counts:
-            dominant_speaker = max(
-                speaker_counts.keys(), key=lambda x: speaker_counts[x]
-            )
-        else:
-            dominant_speaker = segment_speaker
+        # Determine segment's dominant speaker (majority vote, excluding None)
+        speaker_counts = Counter(sp for sp in word_speakers if sp is not None)
+        dominant_speaker = speaker_counts.most_common(1)[0][0] if speaker_counts else segment_speaker
 
-        for word in segment_words:
+        for word_idx, word in enumerate(segment_words):
             # Use word-level speaker if available, otherwise use segment's dominant speaker
             word_speaker = word.get("speaker", None)
 
@@ -431,7 +395,6 @@ def process_transcription_word_mode(result: Dict) -> pd.DataFrame:
                 word_speaker = dominant_speaker
             elif word_speaker != dominant_speaker:
                 # Calculate if this word is isolated (different from surrounding words)
-                word_idx = segment_words.index(word)
                 prev_speaker = (
                     segment_words[word_idx - 1].get("speaker", dominant_speaker)
                     if word_idx > 0
@@ -538,8 +501,8 @@ def save_results(df: pd.DataFrame, is_segment_mode: bool = False):
             df = df[df["text"].str.len() <= 30]
 
     df["text"] = df["text"].apply(lambda x: f'"{x}"')
-    df.to_excel(_2_CLEANED_CHUNKS, index=False)
-    rprint(f"[green]📊 Excel file saved to {_2_CLEANED_CHUNKS}[/green]")
+    write_table(df, _2_CLEANED_CHUNKS)
+    rprint(f"[green]📊 Word table saved to {_2_CLEANED_CHUNKS}[/green]")
 
 
 def save_segments(result: dict):
@@ -581,7 +544,7 @@ def save_segments(result: dict):
     # Rename speaker_id to speaker for consistency
     if 'speaker_id' in df_segments.columns:
         df_segments = df_segments.rename(columns={'speaker_id': 'speaker'})
-    df_segments.to_excel(_2_SEGMENTS, index=False)
+    write_table(df_segments, _2_SEGMENTS)
     rprint(f"[green]Segments file saved to {_2_SEGMENTS} ({len(segments_data)} sentences)[/green]")
 
 
@@ -3,9 +3,9 @@ import json
 import time
 import requests
 import tempfile
-import librosa
 import soundfile as sf
 from rich import print as rprint
+from core.asr_backend.audio_cache import SAMPLE_RATE, load_pcm, load_pcm_window
 from core.utils import *
 
 # ----------------------------------------
@@ -73,17 +73,12 @@ def transcribe_audio_elevenlabs(raw_audio_path, vocal_audio_path, start = None,
             return json.load(f)
     
     # Load audio and process start/end parameters
-    y, sr = librosa.load(vocal_audio_path, sr=16000)
-    audio_duration = len(y) / sr
-    
+    # Slice from the shared decoded PCM instead of decoding the whole file per segment
+    sr = SAMPLE_RATE
     if start is None or end is None:
         start = 0
-        end = audio_duration
-    
-    # Slice audio based on start/end
-    start_sample = int(start * sr)
-    end_sample = int(end * sr)
-    y_slice = y[start_sample:end_sample]
+        end = len(load_pcm(vocal_audio_path)) / sr
+    y_slice = load_pcm_window(vocal_audio_path, start, end)
     
     # Create temporary file for the sliced audio
     with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
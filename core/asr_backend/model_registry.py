@@ -0,0 +1,190 @@
+"""
+Process-wide registry for ASR models.
+Keeps whisper, alignment and diarization models resident across audio segments and jobs,
+evicting the least recently used models once the configured memory budget is exceeded.
+"""
+import gc
+import os
+import threading
+from collections import OrderedDict
+import torch
+from rich import print as rprint
+from core.utils import load_key
+
+MODEL_DIR = load_key("model_dir")
+
+# Rough resident size (GB) used when a model cannot be measured on disk
+DEFAULT_MODEL_SIZE_GB = {
+    "whisper": 3.0,
+    "whisperx": 3.0,
+    "align": 1.3,
+    "diarization": 0.1,
+    "embedding": 0.1,
+}
+DEFAULT_MEMORY_BUDGET_GB = 8.0
+# CPU threads per model, 0 keeps the library default (set by ASR worker processes)
+_CPU_THREADS = 0
+
+
+def set_cpu_threads(threads: int):
+    """Limit intra-op threads for models loaded by this process."""
+    global _CPU_THREADS
+    _CPU_THREADS = max(0, int(threads))
+    if _CPU_THREADS:
+        torch.set_num_threads(_CPU_THREADS)
+
+
+def _cache_settings():
+    """Return (enabled, budget_gb) from config, tolerating older config files."""
+    try:
+        enabled = load_key("model_cache.enabled")
+    except KeyError:
+        enabled = True
+    try:
+        budget_gb = float(load_key("model_cache.max_memory_gb") or DEFAULT_MEMORY_BUDGET_GB)
+    except KeyError:
+        budget_gb = DEFAULT_MEMORY_BUDGET_GB
+    return enabled is not False, budget_gb
+
+
+def _dir_size_gb(path: str) -> float:
+    """Size of a local model directory in GB, 0 if it cannot be measured."""
+    if not path or not os.path.isdir(path):
+        return 0.0
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total / (1024 ** 3)
+
+
+def _release(model):
+    del model
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class ModelRegistry:
+    """LRU cache of loaded models bounded by an estimated memory budget."""
+
+    def __init__(self):
+        self._models = OrderedDict()  # key -> (model, size_gb)
+        self._lock = threading.RLock()
+
+    def get(self, key: tuple, loader, size_gb: float):
+        """Return the model for `key`, loading it with `loader()` on a miss."""
+        enabled, budget_gb = _cache_settings()
+        if not enabled:
+            return loader()
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                rprint(f"[green]♻️ Reusing resident model:[/green] {key[0]} {key[1]}")
+                return self._models[key][0]
+
+            self._evict_to_budget(budget_gb - size_gb)
+            model = loader()
+            self._models[key] = (model, size_gb)
+            rprint(f"[cyan]📦 Model registry:[/cyan] {len(self._models)} resident, {self.used_gb():.2f}/{budget_gb:.2f} GB")
+            return model
+
+    def used_gb(self) -> float:
+        with self._lock:
+            return sum(size for _, size in self._models.values())
+
+    def evict(self, key: tuple) -> bool:
+        with self._lock:
+            entry = self._models.pop(key, None)
+        if entry is None:
+            return False
+        _release(entry[0])
+        return True
+
+    def clear(self):
+        with self._lock:
+            entries = list(self._models.values())
+            self._models.clear()
+        for model, _ in entries:
+            _release(model)
+
+    def _evict_to_budget(self, budget_gb: float):
+        while self._models and self.used_gb() > budget_gb:
+            key, (model, size) = self._models.popitem(last=False)
+            rprint(f"[yellow]🧹 Evicting model {key[0]} {key[1]} ({size:.2f} GB)[/yellow]")
+            _release(model)
+
+
+REGISTRY = ModelRegistry()
+
+
+# ============================================================================
+# Model accessors
+# ============================================================================
+
+def get_whisper_model(model_path: str, device: str, compute_type: str):
+    """Faster-Whisper model shared across segments."""
+    def loader():
+        from faster_whisper import WhisperModel
+        return WhisperModel(
+            model_path, device=device, compute_type=compute_type,
+            cpu_threads=_CPU_THREADS, download_root=MODEL_DIR,
+        )
+
+    size_gb = _dir_size_gb(model_path) or DEFAULT_MODEL_SIZE_GB["whisper"]
+    return REGISTRY.get(("whisper", model_path, device, compute_type, _CPU_THREADS), loader, size_gb)
+
+
+def get_whisperx_model(model_path: str, device: str, compute_type: str, language, vad_options: dict, asr_options: dict):
+    """WhisperX pipeline, keyed by the options baked into it at load time."""
+    def loader():
+        import whisperx
+        return whisperx.load_model(
+            model_path,
+            device,
+            compute_type=compute_type,
+            language=language,
+            vad_options=vad_options,
+            asr_options=asr_options,
+            download_root=MODEL_DIR,
+            threads=_CPU_THREADS or 4,
+        )
+
+    options_key = (language, tuple(sorted(vad_options.items())), repr(sorted(asr_options.items())))
+    size_gb = _dir_size_gb(model_path) or DEFAULT_MODEL_SIZE_GB["whisperx"]
+    return REGISTRY.get(("whisperx", model_path, device, compute_type, _CPU_THREADS, options_key), loader, size_gb)
+
+
+def get_align_model(language: str, device: str):
+    """WhisperX alignment model and metadata, local cache first then online."""
+    def loader():
+        import whisperx
+        model_cache_dir = os.path.abspath(MODEL_DIR)
+        rprint(f"[cyan]🔍 Loading alignment model from:[/cyan] {model_cache_dir}")
+        try:
+            os.environ["HF_HUB_OFFLINE"] = "1"
+            loaded = whisperx.load_align_model(language_code=language, device=device, model_dir=model_cache_dir)
+            rprint("[green]✓ Alignment model loaded from local cache[/green]")
+        except Exception:
+            rprint("[yellow]⚠️ Local cache miss, trying online download...[/yellow]")
+            os.environ.pop("HF_HUB_OFFLINE", None)
+            loaded = whisperx.load_align_model(language_code=language, device=device, model_dir=model_cache_dir)
+        finally:
+            os.environ.pop("HF_HUB_OFFLINE", None)
+        return loaded
+
+    return REGISTRY.get(("align", language, device), loader, DEFAULT_MODEL_SIZE_GB["align"])
+
+
+def get_diarization_pipeline(hf_token: str, device: str):
+    """pyannote speaker diarization pipeline moved to `device`."""
+    def loader():
+        from pyannote.audio import Pipeline
+        pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", token=hf_token)
+        return pipeline.to(torch.device(device))
+
+    return REGISTRY.get(("diarization", "pyannote/speaker-diarization-3.1", device), loader, DEFAULT_MODEL_SIZE_GB["diarization"])
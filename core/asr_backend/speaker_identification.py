@@ -14,6 +14,7 @@ Usage:
 
 import os
 import re
+import hashlib
 import torch
 import numpy as np
 from pathlib import Path
@@ -24,6 +25,10 @@ from core.utils import load_key
 # Speaker samples directory
 SPEAKER_SAMPLES_DIR = "speaker_samples"
 DEFAULT_QDRANT_COLLECTION = "speaker_embeddings"
+EMBEDDING_MODEL = "pyannote/wespeaker-voxceleb-resnet34-LM"
+# Reference embeddings cached per sample file content, inside the samples directory
+EMBEDDING_CACHE_DIRNAME = ".embedding_cache"
+AUDIO_EXTENSIONS = {'.wav', '.mp3', '.flac', '.ogg', '.m4a'}
 
 
 def generate_speaker_samples(
@@ -107,19 +112,37 @@ def ensure_qdrant_collection(client, collection: str, vector_size: int):
     )
 
 
-def upsert_qdrant_embedding(client, collection: str, speaker_name: str, embedding: np.ndarray):
-    """Upsert speaker embedding into Qdrant."""
+def upsert_qdrant_embeddings(client, collection: str, items: List[Tuple[str, str, np.ndarray]], batch_size: int = 256):
+    """Upsert (speaker_name, sample_hash, embedding) items into Qdrant in batches."""
     from qdrant_client.http import models as qdrant_models
     from uuid import uuid5, NAMESPACE_DNS
 
-    vector = embedding.flatten().tolist()
-    point_id = uuid5(NAMESPACE_DNS, speaker_name)
-    point = qdrant_models.PointStruct(
-        id=str(point_id),
-        vector=vector,
-        payload={"speaker": speaker_name},
-    )
-    client.upsert(collection_name=collection, points=[point])
+    for i in range(0, len(items), batch_size):
+        points = [
+            qdrant_models.PointStruct(
+                # one point per sample, so every sample of a speaker is kept
+                id=str(uuid5(NAMESPACE_DNS, f"{speaker_name}/{sample_hash}")),
+                vector=embedding.flatten().tolist(),
+                payload={"speaker": speaker_name},
+            )
+            for speaker_name, sample_hash, embedding in items[i:i + batch_size]
+        ]
+        client.upsert(collection_name=collection, points=points)
+
+    # drop every other point of these speakers: samples that were re-recorded, edited or deleted,
+    # and the single uuid5(speaker_name) point collections held before per-sample points
+    current_ids = sorted({str(uuid5(NAMESPACE_DNS, f"{speaker_name}/{sample_hash}")) for speaker_name, sample_hash, _ in items})
+    speakers = sorted({speaker_name for speaker_name, _, _ in items})
+    if speakers:
+        client.delete(
+            collection_name=collection,
+            points_selector=qdrant_models.FilterSelector(
+                filter=qdrant_models.Filter(
+                    must=[qdrant_models.FieldCondition(key="speaker", match=qdrant_models.MatchAny(any=speakers))],
+                    must_not=[qdrant_models.HasIdCondition(has_id=current_ids)],
+                )
+            ),
+        )
 
 
 def query_qdrant_embedding(
@@ -163,27 +186,63 @@ def query_qdrant_embedding(
     return best_speaker, best_score
 
 
+class EmbeddingIndex:
+    """In-process cosine index over reference embeddings, a local stand-in for the Qdrant collection."""
+
+    def __init__(self, reference_embeddings: Dict[str, List[np.ndarray]]):
+        names, vectors = [], []
+        for speaker_name, embeddings in reference_embeddings.items():
+            for embedding in embeddings:
+                names.append(speaker_name)
+                vectors.append(np.asarray(embedding, dtype=np.float32).flatten())
+        self.names = np.array(names, dtype=object)
+        if vectors:
+            matrix = np.stack(vectors)
+            self.matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def query(self, embedding: np.ndarray, top_k: int = 5) -> Tuple[Optional[str], float]:
+        """Best speaker by mean score of its hits among the top-k cosine matches (one matmul)."""
+        if not len(self):
+            return None, 0.0
+        query = np.asarray(embedding, dtype=np.float32).flatten()
+        scores = self.matrix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+
+        speaker_scores: Dict[str, List[float]] = {}
+        for i in top[np.argsort(-scores[top])]:
+            speaker_scores.setdefault(self.names[i], []).append(float(scores[i]))
+        best_speaker = max(speaker_scores, key=lambda name: np.mean(speaker_scores[name]))
+        return best_speaker, float(np.mean(speaker_scores[best_speaker]))
+
+
 def load_speaker_embedding_model(device: str = "cuda", hf_token: str = None):
-    """Load the pyannote speaker embedding model."""
-    from pyannote.audio import Model, Inference
-    
-    # Use wespeaker-voxceleb-resnet34-LM for speaker embeddings
-    model = Model.from_pretrained(
-        "pyannote/wespeaker-voxceleb-resnet34-LM",
-        use_auth_token=hf_token
-    )
-    inference = Inference(model, window="whole")
-    inference.to(torch.device(device))
-    
-    return inference
+    """Load the pyannote speaker embedding model (kept resident by the model registry)."""
+    from core.asr_backend.model_registry import REGISTRY, DEFAULT_MODEL_SIZE_GB
+
+    def loader():
+        from pyannote.audio import Model, Inference
+        # Use wespeaker-voxceleb-resnet34-LM for speaker embeddings
+        model = Model.from_pretrained(EMBEDDING_MODEL, use_auth_token=hf_token)
+        inference = Inference(model, window="whole")
+        inference.to(torch.device(device))
+        return inference
+
+    return REGISTRY.get(("embedding", EMBEDDING_MODEL, device), loader, DEFAULT_MODEL_SIZE_GB["embedding"])
 
 
 def extract_embedding(inference, audio_path: str) -> np.ndarray:
     """Extract speaker embedding from an audio file."""
-    import whisperx
-    
-    # Use whisperx to load audio (more reliable than pyannote's decoder on Windows)
-    audio = whisperx.load_audio(audio_path)
+    from core.asr_backend.audio_cache import decode_pcm
+
+    # Decode with ffmpeg (more reliable than pyannote's decoder on Windows), reference samples are
+    # short one-off files so they are not kept in the job's PCM cache
+    audio = decode_pcm(audio_path)
     waveform = torch.from_numpy(audio).unsqueeze(0)
     audio_dict = {"waveform": waveform, "sample_rate": 16000}
     
@@ -215,62 +274,86 @@ def _normalize_speaker_name(name: str) -> str:
     return match.group(1) if match else name
 
 
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cached_embedding(inference, audio_file: Path, cache_dir: Path, sample_hash: str) -> np.ndarray:
+    """Embedding of a sample file, computed once per file content and model."""
+    cache_file = cache_dir / f"{sample_hash}_{EMBEDDING_MODEL.split('/')[-1]}.npy"
+    if cache_file.exists():
+        try:
+            return np.load(cache_file)
+        except (OSError, ValueError):
+            pass
+    embedding = np.asarray(extract_embedding(inference, str(audio_file)))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    np.save(cache_file, embedding)
+    return embedding
+
+
 def load_reference_embeddings(
     inference,
     samples_dir: str = SPEAKER_SAMPLES_DIR,
 ) -> Tuple[Dict[str, List[np.ndarray]], Optional[object], Optional[str]]:
     """
-    Load and compute embeddings for all reference speaker samples.
+    Load embeddings for all reference speaker samples, computing only those not cached on disk.
     
     Args:
         inference: The speaker embedding inference model
         samples_dir: Directory containing speaker sample audio files
         
     Returns:
-        Dictionary mapping speaker names to their embeddings
+        (speaker name -> embeddings, Qdrant client or None, Qdrant collection or None)
     """
     reference_embeddings: Dict[str, List[np.ndarray]] = {}
     samples_path = Path(samples_dir)
+    cache_dir = samples_path / EMBEDDING_CACHE_DIRNAME
 
     qdrant_client, qdrant_collection = get_qdrant_client()
     
     if not samples_path.exists():
         rprint(f"[yellow]Speaker samples directory not found: {samples_dir}[/yellow]")
-        return reference_embeddings
-    
-    # Supported audio formats
-    audio_extensions = {'.wav', '.mp3', '.flac', '.ogg', '.m4a'}
+        return reference_embeddings, qdrant_client, qdrant_collection
     
-    for audio_file in samples_path.iterdir():
-        if audio_file.suffix.lower() in audio_extensions:
+    points: List[Tuple[str, str, np.ndarray]] = []
+    cached_count = 0
+    for audio_file in sorted(samples_path.iterdir()):
+        if audio_file.suffix.lower() in AUDIO_EXTENSIONS:
             raw_name = audio_file.stem
             speaker_name = _normalize_speaker_name(raw_name)
             try:
-                embedding = extract_embedding(inference, str(audio_file))
+                sample_hash = _file_hash(audio_file)
+                was_cached = any(cache_dir.glob(f"{sample_hash}_*.npy")) if cache_dir.exists() else False
+                embedding = _cached_embedding(inference, audio_file, cache_dir, sample_hash)
+                cached_count += was_cached
                 reference_embeddings.setdefault(speaker_name, []).append(embedding)
-                rprint(f"[green]Loaded reference: {speaker_name} ({raw_name})[/green]")
+                points.append((speaker_name, sample_hash, embedding))
             except Exception as e:
                 rprint(f"[yellow]Failed to load {audio_file}: {e}[/yellow]")
+    rprint(f"[green]Loaded {len(points)} reference samples for {len(reference_embeddings)} speakers ({cached_count} from cache)[/green]")
 
-    if qdrant_client and reference_embeddings:
+    if qdrant_client and points:
         try:
-            vector_size = next(iter(reference_embeddings.values()))[0].flatten().shape[0]
+            vector_size = points[0][2].flatten().shape[0]
             ensure_qdrant_collection(qdrant_client, qdrant_collection, vector_size)
-            upsert_count = 0
-            for speaker_name, embeddings in reference_embeddings.items():
-                for embedding in embeddings:
-                    upsert_qdrant_embedding(qdrant_client, qdrant_collection, speaker_name, embedding)
-                    upsert_count += 1
-            rprint(f"[green]Qdrant upserted {upsert_count} speaker embeddings[/green]")
+            upsert_qdrant_embeddings(qdrant_client, qdrant_collection, points)
+            rprint(f"[green]Qdrant upserted {len(points)} speaker embeddings[/green]")
         except Exception as e:
-            rprint(f"[yellow]Qdrant upsert failed: {e}[/yellow]")
+            # server unreachable: match against the local index instead
+            rprint(f"[yellow]Qdrant upsert failed, using local index: {e}[/yellow]")
+            qdrant_client, qdrant_collection = None, None
 
     return reference_embeddings, qdrant_client, qdrant_collection
 
 
 def identify_speaker(
     embedding: np.ndarray,
-    reference_embeddings: Dict[str, List[np.ndarray]],
+    reference_embeddings,
     threshold: float = 0.5,
 ) -> Tuple[Optional[str], float]:
     """
@@ -278,24 +361,15 @@ def identify_speaker(
     
     Args:
         embedding: The speaker embedding to identify
-        reference_embeddings: Dictionary of reference speaker embeddings
+        reference_embeddings: Dictionary of reference speaker embeddings, or a prebuilt EmbeddingIndex
         threshold: Minimum similarity score to consider a match
         
     Returns:
         Tuple of (speaker_name, similarity_score) or (None, 0.0) if no match
     """
-    if not reference_embeddings:
-        return None, 0.0
-    
-    best_match = None
-    best_score = 0.0
-    
-    for speaker_name, ref_embeddings in reference_embeddings.items():
-        for ref_embedding in ref_embeddings:
-            similarity = cosine_similarity(embedding, ref_embedding)
-            if similarity > best_score:
-                best_score = similarity
-                best_match = speaker_name
+    index = reference_embeddings if isinstance(reference_embeddings, EmbeddingIndex) else EmbeddingIndex(reference_embeddings)
+    # top-1 cosine match over all references
+    best_match, best_score = index.query(embedding, top_k=1)
     
     if best_score >= threshold:
         return best_match, best_score
@@ -346,6 +420,7 @@ def map_speakers_to_identities(
     # Get unique speakers
     unique_speakers = diarize_df["speaker"].unique()
     speaker_mapping = {}
+    local_index = EmbeddingIndex(reference_embeddings)
     
     for speaker_label in unique_speakers:
         # Get all segments for this speaker
@@ -373,12 +448,18 @@ def map_speakers_to_identities(
             embedding = np.mean(np.stack(embeddings, axis=0), axis=0)
             try:
                 if qdrant_client and qdrant_collection:
-                    identified_name, score = query_qdrant_embedding(
-                        qdrant_client, qdrant_collection, embedding, top_k=qdrant_top_k
-                    )
+                    try:
+                        identified_name, score = query_qdrant_embedding(
+                            qdrant_client, qdrant_collection, embedding, top_k=qdrant_top_k
+                        )
+                    except Exception as exc:
+                        # Qdrant went away mid-job: same top-k query against the local index
+                        rprint(f"[yellow]Qdrant query failed, using local index: {exc}[/yellow]")
+                        qdrant_client = None
+                        identified_name, score = local_index.query(embedding, top_k=qdrant_top_k)
                 else:
                     identified_name, score = identify_speaker(
-                        embedding, reference_embeddings, threshold
+                        embedding, local_index, threshold
                     )
 
                 if identified_name and score >= threshold:
@@ -452,8 +533,7 @@ def identify_speakers_in_result(
         rprint("[yellow]Create this directory and add speaker audio samples to enable identification[/yellow]")
         return result
     
-    audio_extensions = {'.wav', '.mp3', '.flac', '.ogg', '.m4a'}
-    sample_files = [f for f in samples_path.iterdir() if f.suffix.lower() in audio_extensions]
+    sample_files = [f for f in samples_path.iterdir() if f.suffix.lower() in AUDIO_EXTENSIONS]
     
     if not sample_files:
         rprint(f"[yellow]No audio files found in {samples_dir}[/yellow]")
@@ -495,10 +575,6 @@ def identify_speakers_in_result(
         
         rprint(f"[green]Speaker identification complete: {len(speaker_mapping)} speakers mapped[/green]")
         
-        # Cleanup
-        del inference
-        torch.cuda.empty_cache()
-        
     except Exception as e:
         import traceback
         rprint(f"[yellow]Speaker identification failed: {e}[/yellow]")
@@ -0,0 +1,98 @@
+"""
+Best-overlap speaker assignment between transcription segments and diarization turns.
+Each speaker's turns become a cumulative coverage curve, so the overlap of any interval with a
+speaker is two binary searches: O((N + M) log M) overall instead of segments x turns.
+Overlapping turns of the same speaker count once (pyannote does not emit those anyway).
+"""
+import numpy as np
+
+
+def _merge_turns(starts, ends):
+    """Union of one speaker's turns, sorted and disjoint"""
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    # a turn starts a new block when it begins after every earlier turn has ended
+    running_end = np.maximum.accumulate(ends)
+    new_block = np.r_[True, starts[1:] > running_end[:-1]]
+    block_ids = np.cumsum(new_block) - 1
+    merged_starts = starts[new_block]
+    merged_ends = np.full(len(merged_starts), -np.inf)
+    np.maximum.at(merged_ends, block_ids, ends)
+    return merged_starts, merged_ends
+
+
+def _coverage(starts, ends, cum, t):
+    """Speaker time covered by merged turns before each time in t"""
+    idx = np.searchsorted(starts, t, side="right")
+    covered = np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0)
+    # the turn containing t only counts up to t
+    last_end = np.where(idx > 0, ends[np.maximum(idx - 1, 0)], 0.0)
+    return covered - np.maximum(last_end - t, 0.0)
+
+
+def overlap_matrix(turn_starts, turn_ends, turn_speakers, seg_starts, seg_ends):
+    """(speakers, overlaps) where overlaps[k, i] is the time segment i shares with speakers[k]"""
+    turn_starts = np.asarray(turn_starts, dtype=float)
+    turn_ends = np.asarray(turn_ends, dtype=float)
+    turn_speakers = np.asarray(turn_speakers, dtype=object)
+    seg_starts = np.asarray(seg_starts, dtype=float)
+    seg_ends = np.asarray(seg_ends, dtype=float)
+
+    # speakers in order of first appearance, so ties resolve like a row-by-row scan
+    _, first = np.unique(turn_speakers.astype(str), return_index=True)
+    speakers = turn_speakers[np.sort(first)]
+
+    overlaps = np.zeros((len(speakers), len(seg_starts)))
+    for k, speaker in enumerate(speakers):
+        mask = turn_speakers == speaker
+        starts, ends = _merge_turns(turn_starts[mask], turn_ends[mask])
+        cum = np.cumsum(ends - starts)
+        overlaps[k] = _coverage(starts, ends, cum, seg_ends) - _coverage(starts, ends, cum, seg_starts)
+    return speakers, np.maximum(overlaps, 0.0)
+
+
+def assign_best_speakers(turn_starts, turn_ends, turn_speakers, seg_starts, seg_ends):
+    """Speaker with the largest overlap for each segment, None where nothing overlaps"""
+    if len(seg_starts) == 0:
+        return []
+    if len(turn_starts) == 0:
+        return [None] * len(seg_starts)
+    speakers, overlaps = overlap_matrix(turn_starts, turn_ends, turn_speakers, seg_starts, seg_ends)
+    best = overlaps.argmax(axis=0)
+    has_overlap = overlaps.max(axis=0) > 0
+    return [speakers[b] if ok else None for b, ok in zip(best.tolist(), has_overlap.tolist())]
+
+
+if __name__ == "__main__":
+    # Synthetic long meeting: 3 hours, 6 speakers, short alternating turns
+    import time
+    rng = np.random.default_rng(0)
+    turn_count, seg_count = 20000, 8000
+    turn_durations = rng.uniform(0.5, 6.0, turn_count)
+    turn_ends = np.cumsum(turn_durations + rng.uniform(0, 0.5, turn_count))
+    turn_starts = turn_ends - turn_durations
+    # some crosstalk: a tenth of the turns start early and overlap the previous speaker
+    crosstalk = rng.random(turn_count) < 0.1
+    turn_starts[crosstalk] -= rng.uniform(0, 1.0, crosstalk.sum())
+    turn_speakers = np.array([f"SPEAKER_{i:02d}" for i in rng.integers(0, 6, turn_count)], dtype=object)
+    seg_starts = np.sort(rng.uniform(0, turn_ends[-1], seg_count))
+    seg_ends = seg_starts + rng.uniform(0.5, 10.0, seg_count)
+
+    t0 = time.perf_counter()
+    fast = assign_best_speakers(turn_starts, turn_ends, turn_speakers, seg_starts, seg_ends)
+    t1 = time.perf_counter()
+    print(f"sweep: {seg_count} segments x {turn_count} turns in {t1 - t0:.3f}s")
+
+    # row-by-row reference on a sample
+    sample = range(0, seg_count, 40)
+    t0 = time.perf_counter()
+    for i in sample:
+        overlaps = {}
+        for s, e, sp in zip(turn_starts, turn_ends, turn_speakers):
+            overlap = min(seg_ends[i], e) - max(seg_starts[i], s)
+            if overlap > 0:
+                overlaps[sp] = overlaps.get(sp, 0.0) + overlap
+        expected = max(overlaps.items(), key=lambda item: item[1])[0] if overlaps else None
+        assert fast[i] == expected, (i, fast[i], expected)
+    t1 = time.perf_counter()
+    print(f"naive: {len(sample)} sampled segments in {t1 - t0:.3f}s (~{(t1 - t0) * 40:.1f}s for all), results match")
@@ -3,9 +3,9 @@ import io
 import json
 import time
 import requests
-import librosa
 import soundfile as sf
 from rich import print as rprint
+from core.asr_backend.audio_cache import SAMPLE_RATE, load_pcm, load_pcm_window
 from core.utils import *
 from core.utils.models import *
 
@@ -22,16 +22,12 @@ def transcribe_audio_302(raw_audio_path: str, vocal_audio_path: str, start: floa
     update_key("whisper.language", WHISPER_LANGUAGE)
     url = "https://api.302.ai/302/whisperx"
     
-    y, sr = librosa.load(vocal_audio_path, sr=16000)
-    audio_duration = len(y) / sr
-    
+    # Slice from the shared decoded PCM instead of decoding the whole file per segment
+    sr = SAMPLE_RATE
     if start is None or end is None:
         start = 0
-        end = audio_duration
-        
-    start_sample = int(start * sr)
-    end_sample = int(end * sr)
-    y_slice = y[start_sample:end_sample]
+        end = len(load_pcm(vocal_audio_path)) / sr
+    y_slice = load_pcm_window(vocal_audio_path, start, end)
     
     audio_buffer = io.BytesIO()
     sf.write(audio_buffer, y_slice, sr, format='WAV', subtype='PCM_16')
@@ -6,10 +6,11 @@ import subprocess
 from datetime import datetime
 import torch
 import whisperx
-import librosa
 from rich import print as rprint
 from core.utils import *
 from core.asr_backend._common import select_vad_parameters, run_speaker_diarization
+from core.asr_backend.model_registry import get_whisper_model, get_whisperx_model, get_align_model
+from core.asr_backend.audio_cache import load_pcm_window
 
 warnings.filterwarnings("ignore")
 MODEL_DIR = load_key("model_dir")
@@ -188,12 +189,8 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, WHISPER_LANGU
 
     whisper_language = None if 'auto' in WHISPER_LANGUAGE else WHISPER_LANGUAGE
 
-    def load_audio_segment(audio_file, start, end):
-        audio, _ = librosa.load(audio_file, sr=16000, offset=start, duration=end - start, mono=True)
-        return audio
-
-    raw_audio_segment = load_audio_segment(raw_audio_file, start, end)
-    vocal_audio_segment = load_audio_segment(vocal_audio_file, start, end)
+    raw_audio_segment = load_pcm_window(raw_audio_file, start, end)
+    vocal_audio_segment = load_pcm_window(vocal_audio_file, start, end)
 
     # -------------------------
     # 1. transcribe raw audio
@@ -202,8 +199,6 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, WHISPER_LANGU
     rprint("[bold green]Note: You will see Progress if working correctly ↓[/bold green]")
 
     if whisper_language == "ja":
-        from faster_whisper import WhisperModel as FwModel
-
         vad_params = select_vad_parameters(vocal_audio_file)
         rms_dbfs = vad_params.pop("_rms_dbfs", None)
         rprint(
@@ -217,7 +212,7 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, WHISPER_LANGU
         asr_log_prob_threshold = load_key("whisper.log_prob_threshold")
         asr_compression_ratio_threshold = load_key("whisper.compression_ratio_threshold")
 
-        fw_model = FwModel(model_name, device=device, compute_type=compute_type, download_root=MODEL_DIR)
+        fw_model = get_whisper_model(model_name, device, compute_type)
         fw_segments, fw_info = fw_model.transcribe(
             raw_audio_segment,
             language=whisper_language,
@@ -243,9 +238,6 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, WHISPER_LANGU
         }
 
         result = _filter_prompt_leak(result, asr_initial_prompt)
-
-        del fw_model
-        torch.cuda.empty_cache()
     else:
         vad_params = select_vad_parameters(vocal_audio_file)
         rms_dbfs = vad_params.pop("_rms_dbfs", None)
@@ -273,24 +265,19 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, WHISPER_LANGU
             "compression_ratio_threshold": asr_compression_ratio_threshold,
         }
         rprint("[bold yellow] You can ignore warning of `Model was trained with torch 1.10.0+cu102, yours is 2.0.0+cu118...`[/bold yellow]")
-        model = whisperx.load_model(
+        model = get_whisperx_model(
             model_name,
             device,
-            compute_type=compute_type,
-            language=whisper_language,
-            vad_options=vad_options,
-            asr_options=asr_options,
-            download_root=MODEL_DIR,
+            compute_type,
+            whisper_language,
+            vad_options,
+            asr_options,
         )
 
         result = model.transcribe(raw_audio_segment, batch_size=batch_size, print_progress=True)
 
         result = _filter_prompt_leak(result, asr_initial_prompt)
 
-        # Free GPU resources
-        del model
-        torch.cuda.empty_cache()
-
     transcribe_time = time.time() - transcribe_start_time
     rprint(f"[cyan]⏱️ time transcribe:[/cyan] {transcribe_time:.2f}s")
 
@@ -304,25 +291,8 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, WHISPER_LANGU
     # 2. align by vocal audio
     # -------------------------
     align_start_time = time.time()
-    # Align timestamps using vocal audio
-    # Pass model_dir for local model cache
-    model_cache_dir = os.path.abspath(MODEL_DIR)
-    rprint(f"[cyan]🔍 Loading alignment model from:[/cyan] {model_cache_dir}")
-    
-    # Try to load alignment model - first attempt with local cache, then online
-    try:
-        # First try with offline mode to use local cache
-        os.environ['HF_HUB_OFFLINE'] = '1'
-        model_a, metadata = whisperx.load_align_model(language_code=result["language"], device=device, model_dir=model_cache_dir)
-        rprint(f"[green]✓ Alignment model loaded from local cache[/green]")
-    except Exception as e:
-        rprint(f"[yellow]⚠️ Local cache miss, trying online download...[/yellow]")
-        # Fallback to online download
-        os.environ.pop('HF_HUB_OFFLINE', None)
-        model_a, metadata = whisperx.load_align_model(language_code=result["language"], device=device, model_dir=model_cache_dir)
-    finally:
-        # Reset offline mode
-        os.environ.pop('HF_HUB_OFFLINE', None)
+    # Align timestamps using vocal audio, alignment model stays resident in the registry
+    model_a, metadata = get_align_model(result["language"], device)
     
     result = whisperx.align(result["segments"], model_a, metadata, vocal_audio_segment, device, return_char_alignments=False)
     align_time = time.time() - align_start_time
@@ -335,10 +305,6 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, WHISPER_LANGU
     asr_initial_prompt = ""
     result = _filter_prompt_leak(result, asr_initial_prompt)
 
-    # Free GPU resources again
-    torch.cuda.empty_cache()
-    del model_a
-
     # Adjust timestamps
     for segment in result['segments']:
         segment['start'] += start
@@ -6,16 +6,17 @@
 - 直接调用 faster-whisper 输出词级时间戳
 
 注意：不要用 librosa 读音频！会导致识别错误。
-faster-whisper 内部用 PyAV，能正确处理音频。
+音频统一由 audio_cache 用 ffmpeg 解码为 16kHz 单声道 PCM（与 faster-whisper 的 PyAV 解码一致）。
 """
 import os
 import re
 import time
 import torch
-from faster_whisper import WhisperModel
 from rich import print as rprint
 from core.utils import *
 from core.asr_backend._common import get_language_prompt, select_vad_parameters
+from core.asr_backend.model_registry import get_whisper_model
+from core.asr_backend.audio_cache import load_pcm_window
 
 MODEL_DIR = load_key("model_dir")
 
@@ -171,20 +172,16 @@ def transcribe_audio_native(raw_audio_file, vocal_audio_file, start, end, WHISPE
         rprint(f"[green]📥 Loading model from HuggingFace:[/green] Systran/faster-whisper-{model_name}")
         model_path = f"Systran/faster-whisper-{model_name}"
     
-    # 直接加载 Faster-Whisper 模型
-    model = WhisperModel(
-        model_path,
-        device=device,
-        compute_type=compute_type,
-        download_root=MODEL_DIR
-    )
+    # 从进程级模型注册表获取 Faster-Whisper 模型（跨分段/任务复用）
+    model = get_whisper_model(model_path, device, compute_type)
     
     # -------------------------
     # 转写音频
     # -------------------------
-    # 注意：直接传文件路径给 faster-whisper，不要用 librosa 读入！
+    # 注意：不要用 librosa 读入！
     # librosa 重采样会导致识别错误（如“人物混行”而非“神仏根香”）
-    # faster-whisper 内部使用 PyAV，能正确处理音频
+    # 这里用 faster-whisper 内部同款 PyAV 解码，只把当前分段的时间窗送入模型，
+    # 避免每个分段都重新转写整个文件
     
     transcribe_start_time = time.time()
     
@@ -215,10 +212,10 @@ def transcribe_audio_native(raw_audio_file, vocal_audio_file, start, end, WHISPE
         f"[cyan]🎤 VAD:[/cyan] RMS={rms_dbfs:.1f} dBFS, threshold={vad_parameters['threshold']}"
     )
     
-    # 使用词级时间戳 + Silero VAD 转写
-    # 直接传文件路径，PyAV 会正确处理音频
+    # 使用词级时间戳 + Silero VAD 转写（仅当前时间窗）
+    window_audio = load_pcm_window(vocal_audio_file, start, end)
     segments_iter, info = model.transcribe(
-        vocal_audio_file,  # 直接传文件路径，不要用 librosa
+        window_audio,
         language=whisper_language,
         beam_size=beam_size,
         best_of=best_of,
@@ -235,14 +232,10 @@ def transcribe_audio_native(raw_audio_file, vocal_audio_file, start, end, WHISPE
     # 转为列表并构建结果
     segments = []
     for seg in segments_iter:
-        # 注意：使用文件路径时，时间戳已是绝对时间
-        # 仅在需要时按 start/end 过滤
-        if seg.start < start or seg.end > end:
-            continue
-            
+        # 时间戳相对于时间窗起点，加上 start 得到绝对时间
         segment_data = {
-            'start': seg.start,  # Already correct timestamps
-            'end': seg.end,
+            'start': seg.start + start,
+            'end': seg.end + start,
             'text': seg.text.strip(),
             'words': []
         }
@@ -250,12 +243,10 @@ def transcribe_audio_native(raw_audio_file, vocal_audio_file, start, end, WHISPE
         # 添加词级时间戳
         if seg.words:
             for word in seg.words:
-                if word.start < start or word.end > end:
-                    continue
                 segment_data['words'].append({
                     'word': word.word,
-                    'start': word.start,
-                    'end': word.end,
+                    'start': word.start + start,
+                    'end': word.end + start,
                     'probability': word.probability
                 })
         
@@ -276,9 +267,5 @@ def transcribe_audio_native(raw_audio_file, vocal_audio_file, start, end, WHISPE
     detected_lang = info.language if hasattr(info, 'language') else WHISPER_LANGUAGE
     update_key("whisper.detected_language", detected_lang)
     
-    # 释放 GPU 资源
-    del model
-    if device == "cuda":
-        torch.cuda.empty_cache()
-    
+    # 模型常驻于注册表，不在此释放
     return {'segments': sentences, 'language': detected_lang}
@@ -391,6 +391,50 @@ def get_subtitle_trim_prompt(text, duration):
     return trim_prompt
 
 
+def get_subtitle_trim_batch_prompt(items):
+    """items: list of (text, duration), results are keyed by their 1-based position"""
+    rule = """考虑以下几点：a. 减少填充词而不修改有意义的内容。b. 省略不必要的修饰语或代词，例如：
+    - "请解释一下你的思考过程" 可以缩短为 "请解释思考过程"
+    - "我们需要仔细分析这个复杂的问题" 可以缩短为 "我们需要分析这个问题"
+    c. 每条字幕单独精简，不要合并或拆分字幕。"""
+    subtitles = "\n".join(
+        f'{i + 1}. 字幕: "{text}" 时长: {duration} 秒'
+        for i, (text, duration) in enumerate(items)
+    )
+    results_json = ",\n".join(
+        f'        "{i + 1}": "第 {i + 1} 条字幕精简后的结果，使用原字幕语言"'
+        for i in range(len(items))
+    )
+
+    trim_prompt = f'''
+## 角色
+你是一名专业的字幕编辑，负责在将超时字幕交给配音演员之前进行编辑和优化。
+你的专长在于巧妙地略微缩短字幕，同时确保原意和结构保持不变。
+
+## 输入
+以下每条字幕的朗读时间都超过了它的时长，请逐条精简：
+<subtitles>
+{subtitles}
+</subtitles>
+
+## 处理规则
+{rule}
+
+## 仅以 JSON 格式输出，不要添加其他文本
+```json
+{{
+    "analysis": "简要分析每条字幕可以省略的填充词",
+    "results": {{
+{results_json}
+    }}
+}}
+```
+
+注意：你的回答必须以 ```json 开头，以 ``` 结尾，不要添加任何其他文本。
+'''.strip()
+    return trim_prompt
+
+
 ## ================================================================
 # @ tts_main
 def get_correct_text_prompt(text):
@@ -0,0 +1,113 @@
+"""
+Single-parse pipeline for the comma / connector / root passes.
+Every sentence from split_by_mark is parsed once with nlp.pipe (unused components disabled),
+then comma cuts, connector cuts and long-sentence cuts are all taken from spans of that one Doc.
+Parsed docs are kept as a DocBin so reruns on the same sentences skip parsing entirely.
+"""
+import os
+import warnings
+from spacy.tokens import DocBin
+from core.spacy_utils.load_nlp_model import init_nlp, SPLIT_BY_MARK_FILE, SPLIT_BY_COMMA_FILE, SPLIT_BY_CONNECTOR_FILE, SPLIT_DOCS_FILE
+from core.spacy_utils.split_by_comma import comma_cut_points
+from core.spacy_utils.split_by_connector import connector_cut_points
+from core.spacy_utils.split_long_by_root import split_long_span, save_nlp_sentences
+from core.utils import rprint
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+# only tokens, POS, dependencies and sentence boundaries are used by the split passes
+UNUSED_COMPONENTS = ["ner", "lemmatizer", "textcat", "textcat_multilabel", "entity_linker", "entity_ruler", "span_ruler"]
+PIPE_BATCH_SIZE = 64
+
+def disable_unused(nlp):
+    """Context manager running `nlp` without the components the split passes never read."""
+    return nlp.select_pipes(disable=[name for name in UNUSED_COMPONENTS if name in nlp.pipe_names])
+
+def _model_id(nlp):
+    return f"{nlp.lang}_{nlp.meta.get('name', '')}-{nlp.meta.get('version', '')}"
+
+def _load_cached_docs(nlp, sentences, cache_file):
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        docs = list(DocBin().from_disk(cache_file).get_docs(nlp.vocab))
+    except Exception as e:
+        rprint(f"[yellow]⚠️ Ignoring unreadable parse cache {cache_file}: {e}[/yellow]")
+        return None
+    model_id = _model_id(nlp)
+    if len(docs) != len(sentences) or any(
+        doc.text != sentence or doc.user_data.get("nlp_model") != model_id
+        for doc, sentence in zip(docs, sentences)
+    ):
+        return None
+    return docs
+
+def parse_sentences(nlp, sentences, cache_file=SPLIT_DOCS_FILE):
+    """Parsed Doc for every sentence, reusing the DocBin from a previous run when the input is unchanged."""
+    docs = _load_cached_docs(nlp, sentences, cache_file)
+    if docs is not None:
+        rprint(f"[blue]♻️ Reusing {len(docs)} parsed sentences from `{cache_file}`[/blue]")
+        return docs
+
+    model_id = _model_id(nlp)
+    with disable_unused(nlp):
+        docs = list(nlp.pipe(sentences, batch_size=PIPE_BATCH_SIZE))
+    doc_bin = DocBin(store_user_data=True)
+    for doc in docs:
+        doc.user_data["nlp_model"] = model_id
+        doc_bin.add(doc)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    doc_bin.to_disk(cache_file)
+    return docs
+
+def split_doc(doc):
+    """(comma pieces, connector pieces) of one parsed sentence, as spans of `doc`"""
+    comma_spans = []
+    start = 0
+    for cut in comma_cut_points(doc):
+        comma_spans.append(doc[start:cut])
+        start = cut + 1
+    comma_spans.append(doc[start:])
+
+    connector_spans = []
+    for span in comma_spans:
+        # strip like the text passes did, so context windows see the same tokens
+        while span and span[0].is_space:
+            span = doc[span.start + 1:span.end]
+        while span and span[-1].is_space:
+            span = doc[span.start:span.end - 1]
+        start = span.start
+        for cut in connector_cut_points(doc, span.start, span.end):
+            connector_spans.append(doc[start:cut])
+            start = cut
+        if start < span.end:
+            connector_spans.append(doc[start:span.end])
+    return comma_spans, connector_spans
+
+def split_marked_sentences(nlp):
+    """Comma, connector and long-sentence splitting of split_by_mark output, parsing each sentence only once."""
+    with open(SPLIT_BY_MARK_FILE, "r", encoding="utf-8") as input_file:
+        sentences = [line.strip() for line in input_file.readlines()]
+
+    docs = parse_sentences(nlp, sentences)
+
+    comma_sentences, connector_sentences, all_split_sentences = [], [], []
+    for doc in docs:
+        comma_spans, connector_spans = split_doc(doc)
+        comma_sentences.extend(span.text.strip() for span in comma_spans)
+        connector_sentences.extend(span.text.strip() for span in connector_spans)
+        for span in connector_spans:
+            all_split_sentences.extend(split_long_span(span, nlp))
+
+    # intermediate files are still written for inspection
+    with open(SPLIT_BY_COMMA_FILE, "w", encoding="utf-8") as output_file:
+        output_file.write("\n".join(comma_sentences) + "\n")
+    with open(SPLIT_BY_CONNECTOR_FILE, "w", encoding="utf-8") as output_file:
+        output_file.write("\n".join(connector_sentences))
+    rprint(f"[green]💾 Sentences split by commas and connectors saved to →  `{SPLIT_BY_COMMA_FILE}`, `{SPLIT_BY_CONNECTOR_FILE}`[/green]")
+
+    save_nlp_sentences(all_split_sentences)
+
+if __name__ == "__main__":
+    nlp = init_nlp()
+    split_marked_sentences(nlp)
@@ -1,3 +1,4 @@
+import threading
 import spacy
 from spacy.cli import download
 from core.utils import rprint, load_key, except_handler
@@ -10,25 +11,50 @@ def get_spacy_model(language: str):
         rprint(f"[yellow]Spacy model does not support '{language}', using en_core_web_md model as fallback...[/yellow]")
     return model
 
-@except_handler("Failed to load NLP Spacy model")
-def init_nlp():
+# (language, model name) -> loaded pipeline, kept resident for the life of the process
+_nlp_cache = {}
+_nlp_lock = threading.Lock()
+
+def get_nlp_language():
     # 优先使用用户设置的语言，如果未设置、为空或为'auto'则使用自动检测的语言
     user_language = load_key("whisper.language")
     detected_language = load_key("whisper.detected_language")
     # 'auto' 表示自动检测，此时应使用 detected_language
     language = user_language if user_language and user_language != 'auto' else detected_language
+    return language, user_language, detected_language
+
+def load_spacy_model(language: str, model: str):
+    """Loaded spaCy pipeline for `model`, loaded (or downloaded) only on the first call per process."""
+    key = (language, model)
+    with _nlp_lock:
+        nlp = _nlp_cache.get(key)
+        if nlp is not None:
+            rprint(f"[green]♻️ Reusing resident NLP Spacy model: <{model}>[/green]")
+            return nlp
+        rprint(f"[blue]⏳ Loading NLP Spacy model: <{model}> ...[/blue]")
+        try:
+            nlp = spacy.load(model)
+        except:
+            rprint(f"[yellow]Downloading {model} model...[/yellow]")
+            rprint("[yellow]If download failed, please check your network and try again.[/yellow]")
+            download(model)
+            nlp = spacy.load(model)
+        _nlp_cache[key] = nlp
+        rprint("[green]✅ NLP Spacy model loaded successfully![/green]")
+        return nlp
+
+@except_handler("Failed to load NLP Spacy model")
+def init_nlp():
+    language, user_language, detected_language = get_nlp_language()
     rprint(f"[blue]🔤 NLP language: {language} (user: {user_language}, detected: {detected_language})[/blue]")
-    model = get_spacy_model(language)
-    rprint(f"[blue]⏳ Loading NLP Spacy model: <{model}> ...[/blue]")
-    try:
-        nlp = spacy.load(model)
-    except:
-        rprint(f"[yellow]Downloading {model} model...[/yellow]")
-        rprint("[yellow]If download failed, please check your network and try again.[/yellow]")
-        download(model)
-        nlp = spacy.load(model)
-    rprint("[green]✅ NLP Spacy model loaded successfully![/green]")
-    return nlp
+    return load_spacy_model(language, get_spacy_model(language))
+
+def preload_nlp():
+    """Warm the model cache for the configured language, e.g. at backend startup."""
+    language, _, _ = get_nlp_language()
+    if not language:
+        return None
+    return load_spacy_model(language, get_spacy_model(language))
 
 # --------------------
 # define the intermediate files
@@ -36,3 +62,4 @@ def init_nlp():
 SPLIT_BY_COMMA_FILE = "output/log/split_by_comma.txt"
 SPLIT_BY_CONNECTOR_FILE = "output/log/split_by_connector.txt"
 SPLIT_BY_MARK_FILE = "output/log/split_by_mark.txt"
+SPLIT_DOCS_FILE = "output/log/split_by_mark.spacy"
@@ -27,20 +27,25 @@ def analyze_comma(start, doc, token):
 
     return suitable_for_splitting
 
+def comma_cut_points(doc, start=0, end=None):
+    """Indices of the commas in doc[start:end] that the sentence should be cut at"""
+    end = len(doc) if end is None else end
+    cuts = []
+    for token in doc[start:end]:
+        if token.text == "," or token.text == "，":
+            if analyze_comma(start, doc, token):
+                rprint(f"[yellow]✂️  Split at comma: {doc[start:token.i][-4:]},| {doc[token.i + 1:][:4]}[/yellow]")
+                cuts.append(token.i)
+                start = token.i + 1
+    return cuts
+
 def split_by_comma(text, nlp):
     doc = nlp(text)
     sentences = []
     start = 0
-    
-    for i, token in enumerate(doc):
-        if token.text == "," or token.text == "，":
-            suitable_for_splitting = analyze_comma(start, doc, token)
-            
-            if suitable_for_splitting:
-                sentences.append(doc[start:token.i].text.strip())
-                rprint(f"[yellow]✂️  Split at comma: {doc[start:token.i][-4:]},| {doc[token.i + 1:][:4]}[/yellow]")
-                start = token.i + 1
-    
+    for cut in comma_cut_points(doc):
+        sentences.append(doc[start:cut].text.strip())
+        start = cut + 1
     sentences.append(doc[start:].text.strip())
     return sentences
 
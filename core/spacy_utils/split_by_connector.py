@@ -186,47 +186,42 @@ def analyze_connectors(doc, token):
     else:
         return True, False
 
+def connector_cut_points(doc, start=0, end=None, context_words=5):
+    """
+    Indices in doc[start:end] to cut before, found in one left-to-right walk.
+    After a cut the next piece starts at the connector, so its left context only reaches back to the cut.
+    """
+    end = len(doc) if end is None else end
+    cuts = []
+    for token in doc[start:end]:
+        i = token.i
+        split_before, _ = analyze_connectors(doc, token)
+        if not split_before:
+            continue
+        if i + 1 < end and doc[i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
+            continue
+
+        left_words = doc[max(start, i - context_words):i]
+        right_words = doc[i + 1:min(end, i + context_words + 1)]
+
+        left_words = [word.text for word in left_words if not word.is_punct]
+        right_words = [word.text for word in right_words if not word.is_punct]
+
+        if len(left_words) >= context_words and len(right_words) >= context_words:
+            rprint(f"[yellow]✂️  Split before '{token.text}': {' '.join(left_words)}| {token.text} {' '.join(right_words)}[/yellow]")
+            cuts.append(i)
+            start = i
+    return cuts
+
 def split_by_connectors(text, context_words=5, nlp=None):
     doc = nlp(text)
-    sentences = [doc.text]  # init
-    
-    while True:
-        # Handle each task with a single cut
-        # avoiding the fragmentation of a sentence into multiple parts at the same time.
-        split_occurred = False
-        new_sentences = []
-        
-        for sent in sentences:
-            doc = nlp(sent)
-            start = 0
-            
-            for i, token in enumerate(doc):
-                split_before, _ = analyze_connectors(doc, token)
-                
-                if i + 1 < len(doc) and doc[i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
-                    continue
-                
-                left_words = doc[max(0, token.i - context_words):token.i]
-                right_words = doc[token.i+1:min(len(doc), token.i + context_words + 1)]
-                
-                left_words = [word.text for word in left_words if not word.is_punct]
-                right_words = [word.text for word in right_words if not word.is_punct]
-                
-                if len(left_words) >= context_words and len(right_words) >= context_words and split_before:
-                    rprint(f"[yellow]✂️  Split before '{token.text}': {' '.join(left_words)}| {token.text} {' '.join(right_words)}[/yellow]")
-                    new_sentences.append(doc[start:token.i].text.strip())
-                    start = token.i
-                    split_occurred = True
-                    break
-            
-            if start < len(doc):
-                new_sentences.append(doc[start:].text.strip())
-        
-        if not split_occurred:
-            break
-        
-        sentences = new_sentences
-    
+    sentences = []
+    start = 0
+    for cut in connector_cut_points(doc, context_words=context_words):
+        sentences.append(doc[start:cut].text.strip())
+        start = cut
+    if start < len(doc):
+        sentences.append(doc[start:].text.strip())
     return sentences
 
 def split_sentences_main(nlp):
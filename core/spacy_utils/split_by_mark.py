@@ -3,7 +3,10 @@ import re
 import pandas as pd
 import warnings
 from core.spacy_utils.load_nlp_model import init_nlp, SPLIT_BY_MARK_FILE
+from core.spacy_utils.doc_pipeline import disable_unused
 from core.utils.config_utils import load_key, get_joiner
+from core.utils.models import _2_SEGMENTS, _2_CLEANED_CHUNKS
+from core.utils.table_io import read_table
 from rich import print as rprint
 
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -84,8 +87,8 @@ def split_by_mark(nlp):
     language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language
     joiner = get_joiner(language)
     rprint(f"[blue]🔍 Using {language} language joiner: '{joiner}'[/blue]")
-    segments_path = "output/log/segments.xlsx"
-    chunks_path = "output/log/cleaned_chunks.xlsx"
+    segments_path = _2_SEGMENTS
+    chunks_path = _2_CLEANED_CHUNKS
 
     def has_punctuation(text_list: list) -> bool:
         punctuation_marks = {"。", "、", "！", "？", ".", ",", "!", "?", "；", "：", ";", ":"}
@@ -99,19 +102,19 @@ def split_by_mark(nlp):
         return ratio >= 0.2
 
     if os.path.exists(segments_path):
-        segments_df = pd.read_excel(segments_path)
+        segments_df = read_table(segments_path)
         if "text" not in segments_df.columns:
-            raise ValueError("segments.xlsx missing required column: text")
+            raise ValueError(f"{segments_path} missing required column: text")
         base_sentences = segments_df["text"].astype(str).tolist()
         use_segments_base = not has_punctuation(base_sentences)
         if use_segments_base:
-            rprint("[blue]🧩 Using segments.xlsx as sentence base (no punctuation detected)[/blue]")
+            rprint("[blue]🧩 Using ASR segments as sentence base (no punctuation detected)[/blue]")
         else:
-            rprint("[blue]🧩 segments.xlsx has punctuation, using spaCy split[/blue]")
+            rprint("[blue]🧩 ASR segments have punctuation, using spaCy split[/blue]")
     else:
-        chunks = pd.read_excel(chunks_path)
+        chunks = read_table(chunks_path)
         base_sentences = chunks["text"].astype(str).tolist()
-        rprint("[yellow]⚠️ segments.xlsx not found, fallback to cleaned_chunks.xlsx[/yellow]")
+        rprint(f"[yellow]⚠️ {segments_path} not found, fallback to {chunks_path}[/yellow]")
         use_segments_base = False
     
     # 从配置读取时间间隔阈值
@@ -133,7 +136,8 @@ def split_by_mark(nlp):
     else:
         # Step 1: 先用 spaCy 根据标点切分
         full_text = joiner.join(base_sentences)
-        doc = nlp(full_text)
+        with disable_unused(nlp):
+            doc = nlp(full_text)
         assert doc.has_annotation("SENT_START")
 
         # 处理 - 和 ... 的情况
@@ -166,7 +170,7 @@ def split_by_mark(nlp):
         
         if time_gap_threshold and time_gap_threshold > 0:
             # 需要重新加载原始 chunks（带时间信息）
-            chunks_with_time = pd.read_excel(chunks_path)
+            chunks_with_time = read_table(chunks_path)
             chunks_with_time['duration'] = chunks_with_time['end'] - chunks_with_time['start']
             chunks_with_time['gap_to_next'] = chunks_with_time['start'].shift(-1) - chunks_with_time['end']
             
@@ -61,22 +61,18 @@ def split_extremely_long_sentence(doc):
     return sentences
 
 
-def split_long_by_root_main(nlp):
-    with open(SPLIT_BY_CONNECTOR_FILE, "r", encoding="utf-8") as input_file:
-        sentences = input_file.readlines()
-
-    all_split_sentences = []
-    for sentence in sentences:
-        doc = nlp(sentence.strip())
-        if len(doc) > 60:
-            split_sentences = split_long_sentence(doc)
-            if any(len(nlp(sent)) > 60 for sent in split_sentences):
-                split_sentences = [subsent for sent in split_sentences for subsent in split_extremely_long_sentence(nlp(sent))]
-            all_split_sentences.extend(split_sentences)
-            rprint(f"[yellow]✂️  Splitting long sentences by root: {sentence[:30]}...[/yellow]")
-        else:
-            all_split_sentences.append(sentence.strip())
+def split_long_span(doc, nlp, max_tokens=60):
+    """Cut a parsed sentence (Doc or Span) longer than `max_tokens` at its roots, then evenly if still too long."""
+    if len(doc) <= max_tokens:
+        return [doc.text.strip()]
+    split_sentences = split_long_sentence(doc)
+    # the pieces only need tokenizing again, not parsing
+    if any(len(nlp.make_doc(sent)) > max_tokens for sent in split_sentences):
+        split_sentences = [subsent for sent in split_sentences for subsent in split_extremely_long_sentence(nlp.make_doc(sent))]
+    rprint(f"[yellow]✂️  Splitting long sentences by root: {doc.text[:30]}...[/yellow]")
+    return split_sentences
 
+def save_nlp_sentences(all_split_sentences):
     punctuation = string.punctuation + "'" + '"'  # include all punctuation and apostrophe ' and "
 
     with open(_3_1_SPLIT_BY_NLP, "w", encoding="utf-8") as output_file:
@@ -89,11 +85,21 @@ def split_long_by_root_main(nlp):
                 continue
             output_file.write(sentence + "\n")
 
-    # Keep split_by_connector.txt for user inspection (no longer deleting)
-    os.remove(SPLIT_BY_CONNECTOR_FILE)   
-
     rprint(f"[green]💾 Long sentences split by root saved to →  {_3_1_SPLIT_BY_NLP}[/green]")
 
+def split_long_by_root_main(nlp):
+    with open(SPLIT_BY_CONNECTOR_FILE, "r", encoding="utf-8") as input_file:
+        sentences = [sentence.strip() for sentence in input_file.readlines()]
+
+    all_split_sentences = []
+    for doc in nlp.pipe(sentences):
+        all_split_sentences.extend(split_long_span(doc, nlp))
+
+    save_nlp_sentences(all_split_sentences)
+
+    # Keep split_by_connector.txt for user inspection (no longer deleting)
+    os.remove(SPLIT_BY_CONNECTOR_FILE)
+
 if __name__ == "__main__":
     nlp = init_nlp()
     split_long_by_root_main(nlp)
@@ -1,22 +1,63 @@
 import os
 import json
 import time
-from threading import Lock
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+import httpx
 import json_repair
-from openai import OpenAI
+from openai import OpenAI, APIStatusError
 from core.utils.config_utils import load_key
 from rich import print as rprint
 from core.utils.decorator import except_handler
+from core.utils.rate_limiter import AdaptiveLimiter, parse_retry_after
 
 # ------------
 # cache gpt response
 # ------------
 
-LOCK = Lock()
 GPT_LOG_FOLDER = 'output/gpt_log'
+CACHE_DB = os.path.join(GPT_LOG_FOLDER, 'llm_cache.db')
+# Serializes appends to the human readable logs, the sqlite store handles its own locking
+LOG_LOCK = threading.Lock()
+# Prompts currently being requested: cache key -> Event set when the request finishes
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+def _cache_key(model, prompt, resp_type):
+    raw = json.dumps([model, resp_type, prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def _connect():
+    """Open the cache db, one short-lived connection per operation so a cleaned output dir is picked up."""
+    os.makedirs(GPT_LOG_FOLDER, exist_ok=True)
+    conn = sqlite3.connect(CACHE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        log_title TEXT,
+        model TEXT,
+        resp_type TEXT,
+        prompt TEXT,
+        resp_content TEXT,
+        resp TEXT,
+        timestamp TEXT,
+        duration_seconds REAL
+    )""")
+    return conn
+
+def _append_log(log_entry, log_title):
+    """Append one entry to output/gpt_log/{log_title}.jsonl for inspection."""
+    file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.jsonl")
+    line = json.dumps(log_entry, ensure_ascii=False)
+    with LOG_LOCK:
+        os.makedirs(GPT_LOG_FOLDER, exist_ok=True)
+        with open(file, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
 
 def _save_cache(model, prompt, resp_content, resp_type, resp, message=None, log_title="default", duration_seconds=None, cached=False):
-    """Save LLM response to cache file with timing information.
+    """Save LLM response to the cache store and the readable log.
     
     Args:
         model: The model name used for the request
@@ -24,44 +65,112 @@ def _save_cache(model, prompt, resp_content, resp_type, resp, message=None, log_
         resp_content: Raw response content string
         resp_type: Response type (json, str, etc.)
         resp: Parsed response object
-        message: Optional error message
+        message: Optional error message, errored responses are logged but never served from cache
         log_title: Log file title/name
         duration_seconds: Time taken for the API call (None if cache hit)
         cached: Whether this was a cache hit
     """
-    with LOCK:
-        logs = []
-        file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.json")
-        os.makedirs(os.path.dirname(file), exist_ok=True)
-        if os.path.exists(file):
-            with open(file, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-        
-        log_entry = {
-            "model": model, 
-            "prompt": prompt, 
-            "resp_content": resp_content, 
-            "resp_type": resp_type, 
-            "resp": resp, 
-            "message": message,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "duration_seconds": duration_seconds,
-            "cached": cached
-        }
-        logs.append(log_entry)
-        
-        with open(file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, ensure_ascii=False, indent=4)
-
-def _load_cache(prompt, resp_type, log_title):
-    with LOCK:
-        file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.json")
-        if os.path.exists(file):
-            with open(file, 'r', encoding='utf-8') as f:
-                for item in json.load(f):
-                    if item["prompt"] == prompt and item["resp_type"] == resp_type:
-                        return item["resp"]
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    if message is None:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_cache_key(model, prompt, resp_type), log_title, model, resp_type, prompt,
+                 resp_content, json.dumps(resp, ensure_ascii=False), timestamp, duration_seconds),
+            )
+
+    _append_log({
+        "model": model, 
+        "prompt": prompt, 
+        "resp_content": resp_content, 
+        "resp_type": resp_type, 
+        "resp": resp, 
+        "message": message,
+        "timestamp": timestamp,
+        "duration_seconds": duration_seconds,
+        "cached": cached
+    }, log_title)
+
+def _load_cache(model, prompt, resp_type):
+    if not os.path.exists(CACHE_DB):
         return False
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT resp FROM responses WHERE key = ?", (_cache_key(model, prompt, resp_type),)).fetchone()
+    return json.loads(row[0]) if row else False
+
+def _claim_request(key):
+    """Return None if the caller should send the request, else an Event to wait on."""
+    with _INFLIGHT_LOCK:
+        event = _INFLIGHT.get(key)
+        if event is None:
+            _INFLIGHT[key] = threading.Event()
+        return event
+
+def _finish_request(key):
+    with _INFLIGHT_LOCK:
+        event = _INFLIGHT.pop(key, None)
+    if event is not None:
+        event.set()
+
+# ------------
+# shared client
+# ------------
+
+# One client per (base_url, api_key), reused by every worker thread so requests ride warm keep-alive connections
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _get_client(base_url, api_key):
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get((base_url, api_key))
+        if client is None:
+            # leave headroom above the concurrency ceiling for the summary / reflection calls
+            pool_size = max(4, get_llm_concurrency() * 2)
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=60),
+                timeout=httpx.Timeout(300, connect=10),
+            )
+            # retries are left to except_handler so throttling is seen by the limiter
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+            _CLIENTS[(base_url, api_key)] = client
+        return client
+
+# ------------
+# rate limiting
+# ------------
+
+# Statuses treated as provider throttling
+THROTTLE_STATUS = (429, 503, 529)
+_LIMITER = None
+_LIMITER_SETTINGS = None
+_LIMITER_LOCK = threading.Lock()
+
+def _limiter_settings():
+    """(max_concurrency, rpm, tpm) from config, tolerating older config files."""
+    def optional(key):
+        try:
+            return int(load_key(key) or 0)
+        except KeyError:
+            return 0
+    max_concurrency = optional("api.max_concurrency") or int(load_key("max_workers"))
+    return max(1, max_concurrency), optional("api.rpm"), optional("api.tpm")
+
+def _get_limiter():
+    global _LIMITER, _LIMITER_SETTINGS
+    settings = _limiter_settings()
+    with _LIMITER_LOCK:
+        if _LIMITER is None or settings != _LIMITER_SETTINGS:
+            _LIMITER = AdaptiveLimiter(*settings)
+            _LIMITER_SETTINGS = settings
+        return _LIMITER
+
+def get_llm_concurrency():
+    """Thread pool size for stages fanning out LLM calls, the limiter narrows actual concurrency below it."""
+    return _limiter_settings()[0]
+
+def _estimate_tokens(prompt):
+    # rough: ~1 token per CJK char, ~4 chars per token otherwise, meet in the middle
+    return len(prompt) // 2 + 1
 
 # ------------
 # ask gpt once
@@ -84,21 +193,33 @@ def _emit_llm_log(message: str, duration_ms: int = None, level: str = "INFO"):
 def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
     if not load_key("api.key"):
         raise ValueError("API key is not set")
-    # check cache
-    cached_resp = _load_cache(prompt, resp_type, log_title)
-    if cached_resp:
-        rprint("use cache response")
-        # Log cache hit
-        _emit_llm_log(f"LLM cache hit for {log_title}", level="INFO")
-        return cached_resp
-
     model = load_key("api.model")
+    key = _cache_key(model, prompt, resp_type)
+    # check cache, identical prompts already in flight are waited for instead of re-sent
+    while True:
+        cached_resp = _load_cache(model, prompt, resp_type)
+        if cached_resp:
+            rprint("use cache response")
+            # Log cache hit
+            _emit_llm_log(f"LLM cache hit for {log_title}", level="INFO")
+            return cached_resp
+        pending = _claim_request(key)
+        if pending is None:
+            break
+        pending.wait()
+
+    try:
+        return _request(model, prompt, resp_type, valid_def, log_title)
+    finally:
+        _finish_request(key)
+
+def _request(model, prompt, resp_type, valid_def, log_title):
     base_url = load_key("api.base_url")
     if 'ark' in base_url:
         base_url = "https://ark.cn-beijing.volces.com/api/v3" # huoshan base url
     elif 'v1' not in base_url:
         base_url = base_url.strip('/') + '/v1'
-    client = OpenAI(api_key=load_key("api.key"), base_url=base_url)
+    client = _get_client(base_url, load_key("api.key"))
     response_format = {"type": "json_object"} if resp_type == "json" and load_key("api.llm_support_json") else None
 
     messages = [{"role": "user", "content": prompt}]
@@ -111,9 +232,25 @@ def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
     )
     
     # Time the API call
+    limiter = _get_limiter()
+    est_tokens = _estimate_tokens(prompt)
+    limiter.acquire(est_tokens)
     start_time = time.perf_counter()
-    resp_raw = client.chat.completions.create(**params)
+    try:
+        resp_raw = client.chat.completions.create(**params)
+    except APIStatusError as e:
+        throttled = e.status_code in THROTTLE_STATUS
+        retry_after = parse_retry_after(e.response.headers) if throttled else None
+        limiter.release(ok=False, throttled=throttled, retry_after=retry_after, est_tokens=est_tokens)
+        if throttled:
+            rprint(f"[yellow]⏳ LLM throttled ({e.status_code}), concurrency -> {limiter.concurrency}, retry after {retry_after or 1}s[/yellow]")
+        raise
+    except Exception:
+        limiter.release(ok=False, est_tokens=est_tokens)
+        raise
     end_time = time.perf_counter()
+    usage = getattr(resp_raw, "usage", None)
+    limiter.release(est_tokens=est_tokens, used_tokens=getattr(usage, "total_tokens", None))
     
     duration_seconds = round(end_time - start_time, 3)
     duration_ms = int(duration_seconds * 1000)
@@ -1,5 +1,6 @@
 from ruamel.yaml import YAML
 import threading
+import copy
 import os
 
 # 获取项目根目录（config.yaml 所在位置）
@@ -17,41 +18,118 @@ yaml.preserve_quotes = True
 # load & update config
 # -----------------------
 
-def load_key(key):
+# Parsed config and the (mtime_ns, size) it was read at, replaced as a whole so readers need no lock
+_cache = (None, None)
+
+def _file_stamp():
+    stat = os.stat(CONFIG_PATH)
+    return stat.st_mtime_ns, stat.st_size
+
+def _load_config():
+    """Parsed config, re-read only when config.yaml changed on disk"""
+    global _cache
+    stamp, data = _cache
+    if stamp == _file_stamp():
+        return data
     with lock:
+        stamp = _file_stamp()
+        if _cache[0] == stamp:
+            return _cache[1]
         with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
             data = yaml.load(file)
+        _cache = (stamp, data)
+        return data
 
+def load_key(key):
     keys = key.split('.')
-    value = data
+    value = _load_config()
     for k in keys:
         if isinstance(value, dict) and k in value:
             value = value[k]
         else:
             raise KeyError(f"Key '{k}' not found in configuration")
+    if _deferred_updates:
+        value = _apply_deferred(key, value)
+    # containers are the shared parsed tree, callers only read them
     return value
 
+def _parent_of(data, keys):
+    """Container holding keys[-1], None when an intermediate key is missing"""
+    current = data
+    for k in keys[:-1]:
+        if isinstance(current, dict) and k in current:
+            current = current[k]
+        else:
+            return None
+    return current
+
 def update_key(key, new_value):
+    global _cache
+    keys = key.split('.')
+    if _deferred_updates is not None:
+        # same checks as a real write, against the config this process reads
+        parent = _parent_of(_load_config(), keys)
+        if parent is None:
+            return False
+        if not (isinstance(parent, dict) and keys[-1] in parent):
+            raise KeyError(f"Key '{keys[-1]}' not found in configuration")
+        _deferred_updates[key] = new_value
+        return True
     with lock:
         with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
             data = yaml.load(file)
 
-        keys = key.split('.')
-        current = data
-        for k in keys[:-1]:
-            if isinstance(current, dict) and k in current:
-                current = current[k]
-            else:
-                return False
+        current = _parent_of(data, keys)
+        if current is None:
+            return False
 
         if isinstance(current, dict) and keys[-1] in current:
             current[keys[-1]] = new_value
             with open(CONFIG_PATH, 'w', encoding='utf-8') as file:
                 yaml.dump(data, file)
+            # keep the cache coherent with what was just written
+            _cache = (_file_stamp(), data)
             return True
         else:
             raise KeyError(f"Key '{keys[-1]}' not found in configuration")
 
+# -----------------------
+# Deferred config writes (worker processes)
+# -----------------------
+
+_deferred_updates = None
+
+def defer_config_writes():
+    """Record update_key calls in memory instead of writing config.yaml.
+    Used by worker processes so that only the parent process writes the file."""
+    global _deferred_updates
+    _deferred_updates = {}
+
+def _apply_deferred(key, value):
+    """`value` read for `key`, with this process's deferred writes laid over it"""
+    for deferred_key, new_value in _deferred_updates.items():
+        if deferred_key == key:
+            value = new_value
+        elif key.startswith(deferred_key + '.'):
+            # reading inside a container that was replaced
+            value = new_value
+            for k in key[len(deferred_key) + 1:].split('.'):
+                value = value[k]
+        elif deferred_key.startswith(key + '.'):
+            # a key inside this container was replaced, copy before writing so the shared tree stays intact
+            value = copy.deepcopy(value)
+            keys = deferred_key[len(key) + 1:].split('.')
+            _parent_of(value, keys)[keys[-1]] = new_value
+    return value
+
+def pop_deferred_updates():
+    """Return and reset the updates recorded since the last call"""
+    global _deferred_updates
+    if _deferred_updates is None:
+        return {}
+    updates, _deferred_updates = _deferred_updates, {}
+    return updates
+
 # -----------------------
 # Cancel flag operations
 # -----------------------
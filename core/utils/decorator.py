@@ -1,6 +1,7 @@
 import functools
 import time
 import os
+import random
 from rich import print as rprint
 
 # ------------------------------
@@ -22,7 +23,8 @@ def except_handler(error_msg, retry=0, delay=1, default_return=None):
                         if default_return is not None:
                             return default_return
                         raise last_exception
-                    time.sleep(delay * (2**i))
+                    # full jitter keeps retrying workers from hitting the provider in lockstep
+                    time.sleep(random.uniform(0, delay * (2**i)))
         return wrapper
     return decorator
 
@@ -2,17 +2,26 @@
 # 定义中间产出文件
 # ------------------------------------------
 
-_2_CLEANED_CHUNKS = "output/log/cleaned_chunks.xlsx"
-_2_SEGMENTS = "output/log/segments.xlsx"  # ASR segment级时间戳（用于CJK）
+# 表格产出：装了 pyarrow 用 Parquet，否则退回 Excel（读写见 core/utils/table_io.py）
+try:
+    import pyarrow  # noqa: F401
+    TABLE_FORMAT = "parquet"
+except ImportError:
+    TABLE_FORMAT = "xlsx"
+
+_2_CLEANED_CHUNKS = f"output/log/cleaned_chunks.{TABLE_FORMAT}"
+_2_SEGMENTS = f"output/log/segments.{TABLE_FORMAT}"  # ASR segment级时间戳（用于CJK）
 _3_1_SPLIT_BY_NLP = "output/log/split_by_nlp.txt"
 _3_2_SPLIT_BY_MEANING = "output/log/split_by_meaning.txt"
 _4_1_TERMINOLOGY = "output/log/terminology.json"
 _4_2_TRANSLATION_TXT = "output/gpt_log/translate_expressiveness.txt"
-_4_2_TRANSLATION = "output/log/translation_results.xlsx"
-_5_SPLIT_SUB = "output/log/translation_results_for_subtitles.xlsx"
-_5_REMERGED = "output/log/translation_results_remerged.xlsx"
+_4_2_TRANSLATION = f"output/log/translation_results.{TABLE_FORMAT}"
+_5_SPLIT_SUB = f"output/log/translation_results_for_subtitles.{TABLE_FORMAT}"
+_5_REMERGED = f"output/log/translation_results_remerged.{TABLE_FORMAT}"
 
-_8_1_AUDIO_TASK = "output/audio/tts_tasks.xlsx"
+_6_SUBTITLES = f"output/subtitles.{TABLE_FORMAT}"  # 字幕表（毫秒时间戳），SRT 由它渲染
+_6_AUDIO_SUBTITLES = f"output/audio/subtitles_for_audio.{TABLE_FORMAT}"
+_8_1_AUDIO_TASK = f"output/audio/tts_tasks.{TABLE_FORMAT}"
 
 
 # ------------------------------------------
@@ -26,6 +35,7 @@ _BACKGROUND_AUDIO_FILE = "output/audio/background.mp3"
 _AUDIO_REFERS_DIR = "output/audio/refers"
 _AUDIO_SEGS_DIR = "output/audio/segs"
 _AUDIO_TMP_DIR = "output/audio/tmp"
+_PCM_CACHE_DIR = "output/audio/pcm_cache"
 
 # ------------------------------------------
 # 导出
@@ -41,6 +51,8 @@ __all__ = [
     "_4_2_TRANSLATION",
     "_5_SPLIT_SUB",
     "_5_REMERGED",
+    "_6_SUBTITLES",
+    "_6_AUDIO_SUBTITLES",
     "_8_1_AUDIO_TASK",
     "_OUTPUT_DIR",
     "_AUDIO_DIR",
@@ -49,5 +61,6 @@ __all__ = [
     "_BACKGROUND_AUDIO_FILE",
     "_AUDIO_REFERS_DIR",
     "_AUDIO_SEGS_DIR",
-    "_AUDIO_TMP_DIR"
+    "_AUDIO_TMP_DIR",
+    "_PCM_CACHE_DIR"
 ]
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+
+# ------------
+# token bucket
+# ------------
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, 0 means unlimited."""
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.capacity = float(per_minute or 0)
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` units are available (requests larger than the bucket wait for a full one)."""
+        if not self.capacity:
+            return 0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0
+        return (amount - self.level) * 60 / self.capacity
+
+    def take(self, amount):
+        if self.capacity:
+            self._refill()
+            # may go negative when actual usage exceeds the estimate, later callers then wait it out
+            self.level -= amount
+
+# ------------
+# adaptive limiter
+# ------------
+
+class AdaptiveLimiter:
+    """
+    Gate for concurrent LLM requests.
+    Concurrency follows AIMD: +1 slot per window of successes, halved on throttling.
+    Requests and tokens per minute are enforced with token buckets, and a 429 Retry-After pauses everyone.
+    """
+
+    def __init__(self, max_concurrency, rpm=0, tpm=0, min_concurrency=1, clock=time.monotonic):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_concurrency = max(1, min(int(min_concurrency), self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.clock = clock
+        self._cond = threading.Condition()
+
+    def acquire(self, est_tokens=0):
+        """Block until a request with roughly `est_tokens` tokens may be sent."""
+        with self._cond:
+            while True:
+                wait = max(
+                    self.blocked_until - self.clock(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(est_tokens),
+                )
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    self.requests.take(1)
+                    self.tokens.take(est_tokens)
+                    return
+                # woken early by release(), otherwise re-check once the wait has passed
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, ok=True, throttled=False, retry_after=None, est_tokens=0, used_tokens=None):
+        """Report the outcome of an acquired request, failures other than throttling leave the limit as is."""
+        with self._cond:
+            self.in_flight -= 1
+            if used_tokens is not None:
+                self.tokens.take(used_tokens - est_tokens)
+            if throttled:
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                # jitter so paused workers don't all come back in the same instant
+                pause = (retry_after if retry_after else 1.0) * random.uniform(1.0, 1.2)
+                self.blocked_until = max(self.blocked_until, self.clock() + pause)
+            elif ok:
+                self.limit = min(self.max_concurrency, self.limit + 1 / max(self.limit, 1))
+            self._cond.notify_all()
+
+    @property
+    def concurrency(self):
+        return int(self.limit)
+
+
+def parse_retry_after(headers):
+    """Seconds from a Retry-After / retry-after-ms header, None if absent or unparseable."""
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        # HTTP-date form
+        from email.utils import parsedate_to_datetime
+        try:
+            return max(0.0, parsedate_to_datetime(headers["retry-after"]).timestamp() - time.time())
+        except (TypeError, ValueError, KeyError):
+            return None
+    return None
@@ -0,0 +1,64 @@
+"""
+Typed subtitle table shared by the subtitle and dubbing stages.
+One row per subtitle with integer millisecond times, source / translation text and speaker.
+The table is written once when subtitles are generated and read directly by the dubbing stages;
+SRT files are only rendered from it for players and the editor.
+"""
+import numpy as np
+import pandas as pd
+from core.utils.table_io import read_table, write_table
+
+SUBTITLE_COLUMNS = ["number", "start_ms", "end_ms", "Source", "Translation", "speaker"]
+
+# ------------
+# times
+# ------------
+
+def seconds_to_ms(seconds) -> np.ndarray:
+    return np.round(np.asarray(seconds, dtype=float) * 1000).astype(np.int64)
+
+def ms_to_srt_time(ms: int, sep: str = ",") -> str:
+    """HH:MM:SS,mmm (or with `sep` before the milliseconds)"""
+    ms = int(ms)
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{sep}{ms:03d}"
+
+# ------------
+# table
+# ------------
+
+def build_subtitle_table(sources, translations, starts, ends, speakers=None) -> pd.DataFrame:
+    """Subtitle table from parallel columns, times in seconds"""
+    sources, translations = list(sources), list(translations)
+    speakers = [None] * len(sources) if speakers is None else list(speakers)
+    return pd.DataFrame({
+        "number": np.arange(1, len(sources) + 1, dtype=np.int64),
+        "start_ms": seconds_to_ms(starts),
+        "end_ms": seconds_to_ms(ends),
+        "Source": ['' if pd.isna(s) else str(s) for s in sources],
+        "Translation": ['' if pd.isna(t) else str(t) for t in translations],
+        "speaker": [None if pd.isna(s) else str(s) for s in speakers],
+    }, columns=SUBTITLE_COLUMNS)
+
+def write_subtitle_table(df: pd.DataFrame, path: str):
+    write_table(df[SUBTITLE_COLUMNS], path)
+
+def read_subtitle_table(path: str) -> pd.DataFrame:
+    df = read_table(path)
+    df["start_ms"] = df["start_ms"].astype(np.int64)
+    df["end_ms"] = df["end_ms"].astype(np.int64)
+    for column in ("Source", "Translation"):
+        df[column] = df[column].fillna('').astype(str)
+    if "speaker" not in df.columns:
+        df["speaker"] = None
+    return df
+
+def render_srt(df: pd.DataFrame, columns) -> str:
+    """SRT text with one block per row, the given text columns on consecutive lines"""
+    blocks = []
+    for i, (start_ms, end_ms, *texts) in enumerate(zip(df["start_ms"], df["end_ms"], *(df[c] for c in columns))):
+        second_line = texts[1].strip() if len(texts) > 1 else ''
+        blocks.append(f"{i+1}\n{ms_to_srt_time(start_ms)} --> {ms_to_srt_time(end_ms)}\n{texts[0].strip()}\n{second_line}\n\n")
+    return ''.join(blocks).strip()
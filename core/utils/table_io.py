@@ -0,0 +1,71 @@
+"""
+Typed table artifacts passed between stages.
+Tables are stored as Parquet when pyarrow is installed (paths in models.py already carry the
+right extension), otherwise as Excel like before. List columns round-trip natively in Parquet.
+"""
+import ast
+import os
+import numpy as np
+import pandas as pd
+from core.utils.config_utils import load_key
+
+# ------------
+# list cells
+# ------------
+
+def as_list(value):
+    """List cell as plain python lists: parses strings from Excel, unwraps numpy arrays from Parquet."""
+    if isinstance(value, str):
+        return ast.literal_eval(value)
+    if isinstance(value, np.ndarray):
+        return [as_list(v) if isinstance(v, np.ndarray) else v for v in value.tolist()]
+    if isinstance(value, (list, tuple)):
+        return [as_list(v) if isinstance(v, (np.ndarray, list, tuple)) else v for v in value]
+    return value
+
+def _is_list_column(series):
+    sample = series.dropna()
+    return len(sample) > 0 and isinstance(sample.iloc[0], (list, tuple, np.ndarray))
+
+# ------------
+# read & write
+# ------------
+
+def _export_excel_enabled():
+    try:
+        return bool(load_key("export_excel"))
+    except KeyError:
+        return False
+
+def _to_parquet(df, path):
+    try:
+        df.to_parquet(path, index=False)
+    except (TypeError, ValueError) as e:
+        # pyarrow rejects object columns mixing scalar types, store those as text
+        mixed = [c for c in df.columns if df[c].dtype == object and not _is_list_column(df[c])]
+        if not mixed:
+            raise e
+        df = df.copy()
+        for c in mixed:
+            df[c] = df[c].map(lambda x: x if x is None or isinstance(x, str) else str(x))
+        df.to_parquet(path, index=False)
+
+def write_table(df: pd.DataFrame, path: str):
+    """Write a stage table, plus an .xlsx copy when `export_excel` is enabled."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if path.endswith('.parquet'):
+        _to_parquet(df, path)
+        if _export_excel_enabled():
+            df.to_excel(os.path.splitext(path)[0] + '.xlsx', index=False)
+    else:
+        df.to_excel(path, index=False)
+
+def read_table(path: str) -> pd.DataFrame:
+    """Read a stage table, list columns come back as python lists."""
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+        for c in df.columns:
+            if df[c].dtype == object and _is_list_column(df[c]):
+                df[c] = df[c].map(as_list)
+        return df
+    return pd.read_excel(path)
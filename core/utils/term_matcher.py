@@ -0,0 +1,60 @@
+"""
+Multi-pattern matcher for terminology lookups.
+All glossary terms are compiled into one Aho-Corasick automaton, so finding every term
+contained in a chunk is a single pass over the chunk instead of one substring scan per term.
+"""
+from collections import deque
+
+
+class TermMatcher:
+    """Case-insensitive substring matcher over a fixed list of terms."""
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # term indices ending at each state, including via fail links
+        self._always = []  # empty terms are contained in every text
+        for index, term in enumerate(self.terms):
+            pattern = str(term).lower()
+            if not pattern:
+                self._always.append(index)
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        # breadth first, states one character deep keep failing to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Sorted indices of the terms that occur in `text`"""
+        found = set(self._always)
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in str(text).lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return sorted(found)
@@ -34,6 +34,7 @@ interface StageOutputFilesProps {
 
 const fileTypeIcons: Record<string, React.ReactNode> = {
   xlsx: <FileExcelOutlined className="text-green-600" />,
+  parquet: <FileExcelOutlined className="text-green-600" />,
   txt: <FileTextOutlined className="text-blue-600" />,
   json: <FileTextOutlined className="text-yellow-600" />,
   srt: <FileTextOutlined className="text-purple-600" />,
@@ -179,8 +180,8 @@ function PreviewModal({
       )
     }
     
-    // xlsx 使用 markdown 表格样式
-    if (preview.type === 'xlsx') {
+    // xlsx / parquet 使用 markdown 表格样式
+    if (preview.type === 'xlsx' || preview.type === 'parquet') {
       return (
         <div className="bg-gray-50 p-4 rounded-lg overflow-auto max-h-[60vh]">
           <pre className="text-xs font-mono whitespace-pre">{preview.content}</pre>
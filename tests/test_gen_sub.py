@@ -0,0 +1,33 @@
+import pandas as pd
+
+from core._6_gen_sub import WordAligner
+
+
+def aligner_for(text):
+    words = text.split()
+    return WordAligner(pd.DataFrame({
+        "text": words,
+        "start": [float(i) for i in range(len(words))],
+        "end": [i + 0.9 for i in range(len(words))],
+    }))
+
+
+def test_fuzzy_span_stops_at_the_sentence():
+    # ASR heard "Zed" as "said", a few trailing characters further on match the rest of the sentence
+    aligner = aligner_for("I want to thank my good friend said for the help then we cooked dinner together")
+    start, end = aligner.locate("iwanttothankmygoodfriendzed")
+    assert start == 0
+    assert end <= len("iwanttothankmygoodfriendzed") * 1.2
+
+
+def test_sentence_after_fuzzy_match_still_aligns():
+    aligner = aligner_for("I want to thank my good friend said for the help then we cooked dinner together")
+    assert aligner.align([
+        "I want to thank my good friend Zed.",
+        "For the help, then we cooked dinner together.",
+    ]) == [(0.0, 6.9), (8.0, 15.9)]
+
+
+def test_fuzzy_match_rejects_unrelated_text():
+    aligner = aligner_for("completely different words spoken here")
+    assert aligner.locate("iwanttothankmygoodfriendzed") is None
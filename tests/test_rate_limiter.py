@@ -0,0 +1,130 @@
+import importlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import APIStatusError
+
+from core.utils.rate_limiter import parse_retry_after
+
+# core.utils re-exports the ask_gpt function under the module's name
+ask_gpt_module = importlib.import_module("core.utils.ask_gpt")
+
+
+class StubServer:
+    """Local OpenAI-compatible endpoint: the first `throttle` requests get a 429, the rest a completion."""
+
+    def __init__(self, throttle=0, retry_after_ms=None, latency=0.0):
+        self.throttle = throttle
+        self.retry_after_ms = retry_after_ms
+        self.latency = latency
+        self.arrivals = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub.lock:
+                    stub.arrivals.append(time.monotonic())
+                    throttled = len(stub.arrivals) <= stub.throttle
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.latency)
+                with stub.lock:
+                    stub.in_flight -= 1
+                if throttled:
+                    body = {"error": {"message": "rate limited", "type": "rate_limit"}}
+                    self._reply(429, body, {"retry-after-ms": str(stub.retry_after_ms)} if stub.retry_after_ms else {})
+                else:
+                    self._reply(200, {
+                        "id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": "ok"}}],
+                        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                    })
+
+            def _reply(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_llm(monkeypatch, tmp_path):
+    servers = []
+
+    def start(max_concurrency=4, **kwargs):
+        server = StubServer(**kwargs)
+        servers.append(server)
+        config = {
+            "api.key": "test", "api.model": "stub", "api.base_url": server.url, "api.llm_support_json": False,
+            "api.max_concurrency": max_concurrency, "api.rpm": 0, "api.tpm": 0, "max_workers": max_concurrency,
+        }
+        monkeypatch.setattr(ask_gpt_module, "load_key", config.__getitem__)
+        monkeypatch.setattr(ask_gpt_module, "GPT_LOG_FOLDER", str(tmp_path))
+        monkeypatch.setattr(ask_gpt_module, "CACHE_DB", str(tmp_path / "llm_cache.db"))
+        monkeypatch.setattr(ask_gpt_module, "_LIMITER", None)
+        monkeypatch.setattr(ask_gpt_module, "_CLIENTS", {})
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def request(prompt="hello"):
+    return ask_gpt_module._request("stub", prompt, None, None, "test")
+
+
+def test_429_halves_concurrency_and_pauses_for_retry_after(stub_llm):
+    server = stub_llm(max_concurrency=4, throttle=1, retry_after_ms=300)
+
+    with pytest.raises(APIStatusError) as error:
+        request()
+    assert error.value.status_code == 429
+    assert ask_gpt_module._get_limiter().concurrency == 2
+
+    assert request() == "ok"
+    # the retry is held back by the limiter until Retry-After has passed
+    assert server.arrivals[1] - server.arrivals[0] >= 0.3
+
+
+def test_concurrency_never_exceeds_limit(stub_llm):
+    server = stub_llm(max_concurrency=2, latency=0.1)
+
+    threads = [threading.Thread(target=request, args=(f"prompt {i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(server.arrivals) == 6
+    assert server.max_in_flight <= 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"retry-after-ms": "250"}) == 0.25
+    assert parse_retry_after({"retry-after": "2"}) == 2.0
+    assert parse_retry_after({}) is None
+    assert parse_retry_after({"retry-after": "soon"}) is None
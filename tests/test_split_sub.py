@@ -0,0 +1,64 @@
+import spacy
+
+from core._5_split_sub import split_locally, _word_starts
+
+EN = spacy.blank("en")
+
+
+def word_starts(text):
+    return _word_starts(EN.make_doc(text))
+
+
+def test_sentence_end_pairs_with_translated_sentence_end():
+    src = "This is the first sentence. And this is the second one that follows it right here."
+    tr = "这是第一句话。这是紧随其后的第二句话。"
+    assert split_locally(src, tr, word_starts(src)) == (
+        ["This is the first sentence.", "And this is the second one that follows it right here."],
+        ["这是第一句话。", "这是紧随其后的第二句话。"],
+    )
+
+
+def test_comma_pairs_with_translated_comma():
+    src = "He said that the meeting is over, and everyone should go back to work immediately please"
+    tr = "他说会议结束了，大家应该马上回去工作"
+    assert split_locally(src, tr, word_starts(src)) == (
+        ["He said that the meeting is over,", "and everyone should go back to work immediately please"],
+        ["他说会议结束了，", "大家应该马上回去工作"],
+    )
+
+
+def test_word_cut_against_punctuation_goes_to_llm():
+    # the source has no break near the translation's full stop, a word cut would not correspond
+    src = "we looked everywhere for the keys all morning long and finally found them under the sofa"
+    tr = "我们整个上午到处找钥匙。最后在沙发下面找到了。"
+    assert split_locally(src, tr, word_starts(src)) is None
+
+
+def test_unpunctuated_pair_splits_at_words():
+    src = "we looked everywhere for the keys all morning long and finally found them under the sofa"
+    tr = "nous avons cherché les clés partout toute la matinée et les avons enfin trouvées sous le canapé"
+    result = split_locally(src, tr, word_starts(src))
+    assert result is not None
+    src_parts, tr_parts = result
+    assert " ".join(src_parts) == src and " ".join(tr_parts) == tr
+
+
+def test_contraction_offsets_are_not_word_starts():
+    # "did" / "n't" are separate tokens, only "we", "didn't" and "have" start words
+    assert word_starts("and we didn't have") == [4, 7, 14]
+
+
+def test_contractions_stay_attached():
+    for src in [
+        "we wanted to buy the house last year but honestly we didn't have enough cash for it at all",
+        "I really don't think that this is going to work out the way that everyone hopes it will",
+    ]:
+        result = split_locally(src, src.upper(), word_starts(src))
+        assert result is not None
+        for part in result[0]:
+            assert not part.startswith("n't")
+
+
+def test_unspaced_languages_keep_every_token_offset():
+    doc = EN.make_doc("didn't")
+    assert _word_starts(doc, spaced=False) == [0, 3]